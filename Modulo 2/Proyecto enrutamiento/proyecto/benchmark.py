@@ -0,0 +1,194 @@
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from datos import Datos
+from recocido import RecocidoSimulado, PESOS_OPERADORES
+
+# Tamaños de las instancias generadas (nodos totales, incluidos los CDD)
+TAMANOS = (100, 300, 1000, 3000, 10000)
+# Como en el problema original se usan 10 CDD; la capacidad se escala con la demanda
+N_DEPOSITOS = 10
+HOLGURA_CAPACIDAD = 1.1
+# Zona de Culiacán donde se sortean las coordenadas
+LATITUD = (24.70, 24.90)
+LONGITUD = (-107.50, -107.30)
+
+# 'matriz' (densa) o 'bajo_demanda' (CostosBajoDemanda, memoria O(n * k))
+COSTOS = 'matriz'
+
+# Pasos de Metropolis por corrida (el enfriamiento se ajusta para terminar justo ahí)
+PASOS = 50_000
+PASOS_MEMORIA = 2_000
+K_VECINOS = 10
+
+# Costo objetivo para "tiempo a objetivo": esta fracción del costo de la solución inicial
+FRACCION_OBJETIVO = 0.8
+# Margen permitido antes de reportar una regresión contra la línea base
+TOLERANCIA_REGRESION = 0.2
+
+
+def generar_coordenadas(n_nodos, rng: random.Random):
+    """Coordenadas uniformes en la zona de Culiacán: {"CDD1": (lat, lon), ..., "TT1": ...}."""
+    coordenadas = {}
+    for i in range(n_nodos):
+        nombre = f"CDD{i + 1}" if i < N_DEPOSITOS else f"TT{i - N_DEPOSITOS + 1}"
+        coordenadas[nombre] = (rng.uniform(*LATITUD), rng.uniform(*LONGITUD))
+    return coordenadas
+
+
+def generar_instancia(n_nodos, semilla, costos=COSTOS):
+    """
+    Instancia reproducible de n_nodos: mismas coordenadas, demandas y costos para
+    la misma semilla. La capacidad del vehículo se ajusta para que los 10 CDD
+    alcancen a cubrir la demanda total con HOLGURA_CAPACIDAD de margen.
+    """
+    rng = random.Random(semilla)
+    datos = Datos(coordenadas=generar_coordenadas(n_nodos, rng), rng=rng, costos=costos)
+    demanda_total = int(datos.DEMANDAS.sum())
+    datos.CAPACIDAD_VEHICULO = max(datos.CAPACIDAD_VEHICULO,
+                                   math.ceil(HOLGURA_CAPACIDAD * demanda_total / N_DEPOSITOS))
+    return datos
+
+
+def crear_recocido(datos: Datos, pasos, semilla):
+    """
+    Recocido con temperaturas escaladas a la instancia: T_inicial es el costo medio
+    de una arista a los vecinos cercanos y el enfriamiento llega a T_final en `pasos`.
+    """
+    C = datos.COSTO_MATRIX
+    vecinos = datos.vecinos_cercanos(K_VECINOS)
+    t_inicial = float(sum(C[i, vecinos[i]].mean() for i in datos.clientes) / len(datos.clientes))
+    t_final = t_inicial / 200
+    factor = 0.95
+    niveles = math.ceil(math.log(t_final / t_inicial) / math.log(factor))
+    return RecocidoSimulado(datos, t_inicial, t_final, factor, max(1, pasos // niveles),
+                            k_vecinos=K_VECINOS, pesos_operadores=PESOS_OPERADORES,
+                            rng=random.Random(semilla))
+
+
+def medir_instancia(n_nodos, semilla=0, pasos=PASOS, costos=COSTOS):
+    """
+    Mide una instancia:
+    - memoria pico (tracemalloc) de generar los datos y correr PASOS_MEMORIA pasos;
+    - throughput (pasos/s, sin contar el pulido final), tiempo a objetivo y costo
+      final de una corrida de `pasos` pasos sin tracemalloc.
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    datos = generar_instancia(n_nodos, semilla, costos)
+    tiempo_datos = time.perf_counter() - inicio
+    crear_recocido(datos, PASOS_MEMORIA, semilla).optimizar(max_pasos=PASOS_MEMORIA)
+    _, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sa = crear_recocido(datos, pasos, semilla)
+    costo_inicial = sa._generar_solucion_inicial().costo_base
+    objetivo = FRACCION_OBJETIVO * costo_inicial
+    # El generador se reinicia para que la corrida parta de la misma solución inicial
+    sa.rng = random.Random(semilla)
+
+    tiempo_objetivo = None
+
+    def registrar(progreso):
+        nonlocal tiempo_objetivo
+        if tiempo_objetivo is None and progreso['mejor_costo'] <= objetivo:
+            tiempo_objetivo = progreso['tiempo']
+
+    mejor = sa.optimizar(max_pasos=pasos, callback=registrar)
+    estadisticas = sa.estadisticas
+
+    return {
+        'nodos': n_nodos,
+        'clientes': len(datos.clientes),
+        'depositos': len(datos.DEPOSITOS_DISPONIBLES),
+        'semilla': semilla,
+        'costos': costos,
+        'tiempo_datos': tiempo_datos,
+        'memoria_pico_mb': memoria_pico / 2**20,
+        'pasos': estadisticas['pasos'],
+        'tiempo': estadisticas['tiempo'],
+        'pasos_por_segundo': estadisticas['pasos'] / (estadisticas['tiempo'] - estadisticas['tiempo_pulido']),
+        'tiempo_pulido': estadisticas['tiempo_pulido'],
+        'costo_inicial': costo_inicial,
+        'costo_objetivo': objetivo,
+        'tiempo_objetivo': tiempo_objetivo,
+        'costo_final': mejor.costo,
+        'es_valida': mejor.es_valida,
+    }
+
+
+def ejecutar_benchmark(tamanos=TAMANOS, semilla=0, pasos=PASOS, archivo_salida=None, costos=COSTOS):
+    """Mide todas las instancias; opcionalmente guarda los resultados en JSON."""
+    resultados = []
+    for n_nodos in tamanos:
+        resultado = medir_instancia(n_nodos, semilla, pasos, costos)
+        resultados.append(resultado)
+        imprimir_resultado(resultado)
+    if archivo_salida is not None:
+        with open(archivo_salida, "w") as f:
+            json.dump(resultados, f, indent=2)
+    return resultados
+
+
+def comparar_con_base(resultados, resultados_base, tolerancia=TOLERANCIA_REGRESION):
+    """
+    Compara contra una corrida anterior (misma semilla) y devuelve la lista de
+    regresiones: menos pasos/s, más memoria o más tiempo a objetivo que la base
+    por encima de la tolerancia, o costo final peor.
+    """
+    base = {(r['nodos'], r.get('costos', 'matriz')): r for r in resultados_base}
+    regresiones = []
+    for r in resultados:
+        b = base.get((r['nodos'], r['costos']))
+        if b is None:
+            continue
+        n = r['nodos']
+        if r['pasos_por_segundo'] < b['pasos_por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{n} nodos: {r['pasos_por_segundo']:,.0f} pasos/s "
+                               f"(base {b['pasos_por_segundo']:,.0f})")
+        if r['memoria_pico_mb'] > b['memoria_pico_mb'] * (1 + tolerancia):
+            regresiones.append(f"{n} nodos: memoria pico {r['memoria_pico_mb']:.1f} MB "
+                               f"(base {b['memoria_pico_mb']:.1f} MB)")
+        if b['tiempo_objetivo'] is not None and (
+                r['tiempo_objetivo'] is None or r['tiempo_objetivo'] > b['tiempo_objetivo'] * (1 + tolerancia)):
+            regresiones.append(f"{n} nodos: tiempo a objetivo {_formatear_tiempo(r['tiempo_objetivo'])} "
+                               f"(base {_formatear_tiempo(b['tiempo_objetivo'])})")
+        if r['costo_final'] > b['costo_final'] * (1 + tolerancia):
+            regresiones.append(f"{n} nodos: costo final {r['costo_final']:,.2f} (base {b['costo_final']:,.2f})")
+    return regresiones
+
+
+def _formatear_tiempo(tiempo):
+    """Segundos con dos decimales; None (objetivo no alcanzado) como texto."""
+    return f"{tiempo:.2f} s" if tiempo is not None else "no alcanzado"
+
+
+def imprimir_resultado(r):
+    tiempo_objetivo = _formatear_tiempo(r['tiempo_objetivo'])
+    print(f"{r['nodos']:>6} nodos | datos {r['tiempo_datos']:6.2f} s | {r['pasos_por_segundo']:>9,.0f} pasos/s "
+          f"| objetivo {tiempo_objetivo:>12} | pulido {r['tiempo_pulido']:6.2f} s | costo {r['costo_inicial']:>12,.2f} -> {r['costo_final']:>12,.2f} "
+          f"| memoria pico {r['memoria_pico_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+
+    SEMILLA = 0
+    ARCHIVO_RESULTADOS = "benchmark.json"
+    ARCHIVO_BASE = None        # p. ej. "benchmark_base.json" de una corrida anterior
+
+    print(f"--- BENCHMARK DEL RECOCIDO SIMULADO (semilla {SEMILLA}, {PASOS:,} pasos por instancia, "
+          f"costos: {COSTOS}) ---")
+    resultados = ejecutar_benchmark(TAMANOS, SEMILLA, PASOS, ARCHIVO_RESULTADOS, COSTOS)
+
+    if ARCHIVO_BASE is not None:
+        with open(ARCHIVO_BASE) as f:
+            regresiones = comparar_con_base(resultados, json.load(f))
+        for mensaje in regresiones:
+            print(f"REGRESIÓN: {mensaje}")
+        if regresiones:
+            sys.exit(1)
+        print("Sin regresiones contra la línea base.")
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+DIRECTORIO_DOCUMENTOS = Path(__file__).resolve().parent.parent / "documentos"
+
+ARCHIVO_TIENDAS = "datos_distribucion_tiendas.xlsx"
+ARCHIVO_DISTANCIAS = "matriz_distancias.xlsx"
+ARCHIVO_COSTOS = "matriz_costo_combustible.xlsx"
+
+# Cambiar si cambia el formato de la caché para invalidar las anteriores
+VERSION_CACHE = 1
+
+ARREGLOS = ("nodos", "coords", "distancias", "costos")
+
+
+def cargar_documentos(directorio=None, directorio_cache=None, mmap=True):
+    """
+    Carga los libros de Excel del proyecto usando una caché binaria.
+
+    La primera vez lee y valida los tres libros y guarda los arreglos en
+    `directorio_cache/<hash>/*.npy`, donde el hash depende del contenido de los
+    archivos. Las siguientes ejecuciones leen directamente los .npy; con
+    mmap=True las matrices se abren memory-mapped (solo lectura) en lugar de
+    cargarse completas en memoria.
+
+    Devuelve un diccionario con:
+        'nodos': arreglo de IDs ("CDD1", ..., "TT90") en el orden de las matrices
+        'coords': arreglo (n x 2) de latitud/longitud
+        'distancias': matriz (n x n) de distancias
+        'costos': matriz (n x n) de costo de combustible
+    """
+    directorio = Path(directorio) if directorio else DIRECTORIO_DOCUMENTOS
+    directorio_cache = Path(directorio_cache) if directorio_cache else directorio / ".cache"
+    archivos = [directorio / ARCHIVO_TIENDAS, directorio / ARCHIVO_DISTANCIAS, directorio / ARCHIVO_COSTOS]
+
+    destino = directorio_cache / _hash_archivos(archivos)
+    if not all((destino / f"{nombre}.npy").exists() for nombre in ARREGLOS):
+        _escribir_cache(destino, _leer_libros(*archivos))
+
+    modo = "r" if mmap else None
+    return {nombre: np.load(destino / f"{nombre}.npy", mmap_mode=modo) for nombre in ARREGLOS}
+
+
+def _hash_archivos(archivos):
+    """Huella SHA-256 (abreviada) del contenido de los archivos y de la versión de la caché."""
+    huella = hashlib.sha256(f"v{VERSION_CACHE}".encode())
+    for archivo in archivos:
+        with open(archivo, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                huella.update(bloque)
+    return huella.hexdigest()[:16]
+
+
+def _escribir_cache(destino, arreglos):
+    """Escribe los .npy en un directorio temporal y lo renombra al final (escritura atómica)."""
+    temporal = destino.with_name(f"{destino.name}.tmp-{os.getpid()}")
+    temporal.mkdir(parents=True, exist_ok=True)
+    for nombre, arreglo in arreglos.items():
+        np.save(temporal / f"{nombre}.npy", arreglo, allow_pickle=False)
+    try:
+        os.replace(temporal, destino)
+    except OSError:
+        # Otro proceso escribió la misma caché primero
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def _leer_libros(archivo_tiendas, archivo_distancias, archivo_costos):
+    """Lee y valida los tres libros; devuelve los arreglos en el orden de las tiendas."""
+    import pandas as pd
+
+    tiendas = pd.read_excel(archivo_tiendas)
+    faltantes = {"ID", "Latitud_WGS84", "Longitud_WGS84"} - set(tiendas.columns)
+    if faltantes:
+        raise ValueError(f"{archivo_tiendas.name}: faltan las columnas {sorted(faltantes)}")
+    if tiendas["ID"].duplicated().any():
+        raise ValueError(f"{archivo_tiendas.name}: hay IDs repetidos")
+
+    nodos = tiendas["ID"].to_numpy(dtype=str)
+    coords = tiendas[["Latitud_WGS84", "Longitud_WGS84"]].to_numpy(dtype=np.float64)
+    if not np.isfinite(coords).all():
+        raise ValueError(f"{archivo_tiendas.name}: hay coordenadas vacías o inválidas")
+
+    distancias = _leer_matriz(archivo_distancias, nodos)
+    costos = _leer_matriz(archivo_costos, nodos)
+
+    return {"nodos": nodos, "coords": coords, "distancias": distancias, "costos": costos}
+
+
+def _leer_matriz(archivo, nodos):
+    """Lee una matriz cuadrada (primera columna = nombres) y la reordena según `nodos`."""
+    import pandas as pd
+
+    tabla = pd.read_excel(archivo, index_col=0)
+    tabla.index = tabla.index.astype(str)
+    tabla.columns = tabla.columns.astype(str)
+
+    if list(tabla.index) != list(tabla.columns):
+        raise ValueError(f"{archivo.name}: las filas y columnas no tienen los mismos nodos")
+    if set(tabla.index) != set(nodos):
+        raise ValueError(f"{archivo.name}: los nodos no coinciden con {ARCHIVO_TIENDAS}")
+
+    matriz = np.ascontiguousarray(tabla.loc[nodos, nodos].to_numpy(dtype=np.float64))
+    if not np.isfinite(matriz).all() or (matriz < 0).any():
+        raise ValueError(f"{archivo.name}: hay valores vacíos, infinitos o negativos")
+    if np.abs(np.diag(matriz)).max() > 0:
+        raise ValueError(f"{archivo.name}: la diagonal debe ser 0")
+    # Los movimientos 2-opt calculan su delta suponiendo costos simétricos
+    if not np.allclose(matriz, matriz.T):
+        raise ValueError(f"{archivo.name}: la matriz no es simétrica")
+    return matriz
@@ -0,0 +1,90 @@
+import math
+from functools import lru_cache
+import numpy as np
+
+# Pares fuera de las listas de vecinos que se recuerdan (LRU)
+TAMANO_CACHE = 200_000
+
+
+class CostosBajoDemanda:
+    """
+    Proveedor de costos que sustituye a la matriz densa COSTO_MATRIX.
+
+    Se indexa igual que la matriz (C[i, j] con enteros o con arreglos de índices),
+    pero el costo se calcula a partir de las coordenadas: ángulo central de
+    haversine en grados * factor_costo (misma escala que la matriz simulada, sin
+    ruido). Memoria O(n * k) en lugar de O(n^2):
+    - los pares (i, j) de las listas de k vecinos más cercanos se guardan en una
+      matriz dispersa (formato diccionario, clave i * n + j con i < j);
+    - los demás pares escalares pasan por una caché LRU de tamano_cache pares;
+    - los accesos con arreglos se calculan vectorizados, sin caché.
+    """
+
+    def __init__(self, coords, factor_costo, vecinos=None, tamano_cache=TAMANO_CACHE):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.factor_costo = factor_costo
+        self.tamano_cache = tamano_cache
+        self.shape = (len(self.coords), len(self.coords))
+        self._preparar()
+
+        self.cercanos = {}
+        if vecinos is not None:
+            vecinos = np.asarray(vecinos)
+            filas = np.repeat(np.arange(len(vecinos)), vecinos.shape[1])
+            columnas = vecinos.ravel()
+            menores = np.minimum(filas, columnas)
+            mayores = np.maximum(filas, columnas)
+            claves = menores.astype(np.int64) * self.shape[0] + mayores
+            self.cercanos = dict(zip(claves.tolist(), self._costos_vectorizados(menores, mayores).tolist()))
+
+    def _preparar(self):
+        """Coordenadas en radianes como listas (el acceso escalar es más rápido que en NumPy)."""
+        radianes = np.radians(self.coords)
+        self._lat = radianes[:, 0]
+        self._lon = radianes[:, 1]
+        self._cos_lat = np.cos(self._lat)
+        lat, lon, cos_lat = self._lat.tolist(), self._lon.tolist(), self._cos_lat.tolist()
+        escala = math.degrees(2) * self.factor_costo
+
+        @lru_cache(maxsize=self.tamano_cache)
+        def costo_par(i, j):
+            a = math.sin((lat[j] - lat[i]) / 2) ** 2 + cos_lat[i] * cos_lat[j] * math.sin((lon[j] - lon[i]) / 2) ** 2
+            return escala * math.asin(math.sqrt(a))
+
+        self._costo_par = costo_par
+
+    def _costos_vectorizados(self, i, j):
+        """Haversine vectorizado (i y j se combinan con broadcasting)."""
+        a = (np.sin((self._lat[j] - self._lat[i]) / 2) ** 2
+             + self._cos_lat[i] * self._cos_lat[j] * np.sin((self._lon[j] - self._lon[i]) / 2) ** 2)
+        return math.degrees(2) * self.factor_costo * np.arcsin(np.sqrt(a))
+
+    def __getitem__(self, indices):
+        i, j = indices
+        if isinstance(i, np.ndarray) or isinstance(j, np.ndarray):
+            return self._costos_vectorizados(np.asarray(i), np.asarray(j))
+
+        i, j = int(i), int(j)
+        if i == j:
+            return 0.0
+        if i > j:
+            i, j = j, i
+        costo = self.cercanos.get(i * self.shape[0] + j)
+        if costo is None:
+            costo = self._costo_par(i, j)
+        return costo
+
+    def info_cache(self):
+        """Aciertos, fallos y tamaño de la caché LRU (functools)."""
+        return self._costo_par.cache_info()
+
+    def __getstate__(self):
+        # La caché LRU es una función local: no se serializa, se reconstruye
+        estado = self.__dict__.copy()
+        for nombre in ('_lat', '_lon', '_cos_lat', '_costo_par'):
+            del estado[nombre]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._preparar()
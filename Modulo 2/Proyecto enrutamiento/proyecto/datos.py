@@ -1,12 +1,39 @@
-import math
 import random
+import numpy as np
+from scipy.spatial import cKDTree
+from cargador import cargar_documentos
+from costos import CostosBajoDemanda
+
+# Filas por bloque al simular la matriz de costos
+BLOQUE_FILAS = 512
+# Vecinos por nodo cuyos costos guarda CostosBajoDemanda
+K_COSTOS_CERCANOS = 10
 
 class Datos:
     """
     Clase que almacena los datos estáticos del problema de enrutamiento (MDVRP).
+    
+    Con usar_documentos=True las coordenadas y la matriz de costos se toman de
+    los libros de la carpeta documentos (vía la caché de cargador.py) en lugar
+    de simularse.
+    
+    coordenadas: diccionario {nombre: (lat, lon)} que reemplaza a los 100 nodos
+    de Culiacán (p. ej. instancias generadas por benchmark.py).
+    rng: generador random.Random para demandas y costos reproducibles; por
+    omisión se usa el módulo random global.
+    costos: 'matriz' (matriz densa n x n) o 'bajo_demanda' (CostosBajoDemanda:
+    costos calculados desde las coordenadas, para instancias que no caben en
+    memoria como matriz densa). Solo aplica a los costos simulados.
     """
     
-    def __init__(self):
+    def __init__(self, usar_documentos=False, directorio_documentos=None, coordenadas=None, rng=None,
+                 costos='matriz'):
+        if costos not in ('matriz', 'bajo_demanda'):
+            raise ValueError(f"Tipo de costos desconocido: {costos!r}")
+        if usar_documentos and costos != 'matriz':
+            raise ValueError("Con usar_documentos=True los costos se leen como matriz")
+        self.rng = rng if rng is not None else random
+        
         # Coordenadas de los 10 CDD y 90 TT en Culiacán (Simuladas)
         self.COORDENADAS = {
             "CDD1": (24.774908, -107.309857), "CDD2": (24.846399, -107.380268),
@@ -61,29 +88,86 @@ class Datos:
             "TT89": (24.845191, -107.320578), "TT90": (24.877417, -107.344025)
         }
         
-        self.clientes = [f"TT{i}" for i in range(1, 91)]
-        self.DEMANDAS = {cliente: random.randint(100, 500) for cliente in self.clientes}
+        if coordenadas is not None:
+            self.COORDENADAS = dict(coordenadas)
+        
+        documentos = None
+        if usar_documentos:
+            documentos = cargar_documentos(directorio_documentos)
+            self.COORDENADAS = {str(nodo): (float(lat), float(lon))
+                                for nodo, (lat, lon) in zip(documentos['nodos'], documentos['coords'])}
+        
+        # Mapeo nodo -> índice entero (en el orden de COORDENADAS: los CDD primero, después las TT)
+        self.NODOS = list(self.COORDENADAS.keys())
+        self.INDICE_NODO = {nodo: i for i, nodo in enumerate(self.NODOS)}
+        self.COORDS = np.array([self.COORDENADAS[n] for n in self.NODOS])
+        
+        self.clientes = [i for i, nodo in enumerate(self.NODOS) if nodo.startswith("TT")]
+        
+        # Demanda por índice de nodo (los CDD tienen demanda 0)
+        self.DEMANDAS = np.zeros(len(self.NODOS), dtype=np.int64)
+        for cliente in self.clientes:
+            self.DEMANDAS[cliente] = self.rng.randint(100, 500)
         
         self.CAPACIDAD_VEHICULO = 4000 
-        self.DEPOSITOS_DISPONIBLES = [f"CDD{i}" for i in range(1, 11)]
-        self.COSTO_MATRIX = self._cargar_matriz_costos_combustible() 
+        self.DEPOSITOS_DISPONIBLES = [i for i, nodo in enumerate(self.NODOS) if nodo.startswith("CDD")]
+        
+        self._vecinos_cercanos = {}
+        if documentos is not None:
+            # Matrices memory-mapped de solo lectura
+            self.COSTO_MATRIX = documentos['costos']
+            self.DISTANCIAS = documentos['distancias']
+        elif costos == 'bajo_demanda':
+            self.COSTO_MATRIX = CostosBajoDemanda(self.COORDS, self.rng.uniform(800, 1200),
+                                                  vecinos=self.vecinos_cercanos(K_COSTOS_CERCANOS))
+        else:
+            self.COSTO_MATRIX = self._cargar_matriz_costos_combustible() 
+
+    def nombre(self, nodo):
+        """Devuelve el nombre ("CDD3", "TT41", ...) de un índice de nodo."""
+        return self.NODOS[nodo]
+
+    def vecinos_cercanos(self, k):
+        """
+        Lista de candidatos: arreglo (n x k) con los k nodos más cercanos a cada nodo
+        (sin incluirse a sí mismo), ordenados por cercanía. Se construye una sola vez
+        por k con un KD-tree sobre COORDS.
+        """
+        k = min(k, len(self.NODOS) - 1)
+        if k not in self._vecinos_cercanos:
+            _, indices = cKDTree(self.COORDS).query(self.COORDS, k=k + 1)
+            self._vecinos_cercanos[k] = np.ascontiguousarray(indices[:, 1:], dtype=np.int32)
+        return self._vecinos_cercanos[k]
 
     def _cargar_matriz_costos_combustible(self):
-        """Simula la carga de la matriz de costos de combustible."""
-        matrix = {}
-        nodos = list(self.COORDENADAS.keys())
-        FACTOR_COSTO = random.uniform(800, 1200) 
+        """
+        Simula la carga de la matriz de costos de combustible.
+        
+        Devuelve un arreglo NumPy contiguo (n x n) indexado por índice de nodo,
+        construido de forma vectorizada a partir de COORDS. La matriz es
+        simétrica: el ruido se sortea una vez por par de nodos.
+        
+        Se llena por bloques de filas para no crear temporales de n x n (con
+        10,000 nodos cada uno ocuparía 800 MB).
+        """
+        n = len(self.NODOS)
+        FACTOR_COSTO = self.rng.uniform(800, 1200) 
+        generador = np.random.default_rng(self.rng.getrandbits(32))
+        
+        lat = self.COORDS[:, 0]
+        lon = self.COORDS[:, 1]
+        matrix = np.empty((n, n))
+        for i0 in range(0, n, BLOQUE_FILAS):
+            i1 = min(i0 + BLOQUE_FILAS, n)
+            bloque = matrix[i0:i1]
+            np.hypot(lat[i0:i1, None] - lat[None, :], lon[i0:i1, None] - lon[None, :], out=bloque)
+            bloque *= generador.uniform(0.95, 1.05, size=bloque.shape)
+            bloque *= FACTOR_COSTO
         
-        for i in nodos:
-            matrix[i] = {}
-            for j in nodos:
-                if i == j:
-                    matrix[i][j] = 0.0
-                else:
-                    c1 = self.COORDENADAS[i]
-                    c2 = self.COORDENADAS[j]
-                    dx = c1[0] - c2[0]
-                    dy = c1[1] - c2[1]
-                    distancia_euclidiana = math.sqrt(dx**2 + dy**2)
-                    matrix[i][j] = distancia_euclidiana * FACTOR_COSTO * random.uniform(0.95, 1.05)
-        return matrix
\ No newline at end of file
+        # Simetría: el triángulo inferior se copia del superior
+        for i0 in range(0, n, BLOQUE_FILAS):
+            i1 = min(i0 + BLOQUE_FILAS, n)
+            matrix[i0:i1, :i0] = matrix[:i0, i0:i1].T
+            diagonal = matrix[i0:i1, i0:i1]
+            diagonal[:] = np.triu(diagonal) + np.triu(diagonal, k=1).T
+        return matrix
@@ -0,0 +1,150 @@
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import paralelo
+from datos import Datos
+from recocido import RecocidoSimulado, PESOS_OPERADORES
+
+
+def generar_escenarios(datos: Datos, n_escenarios, variacion=0.2, semilla=None):
+    """
+    Genera escenarios "what-if" de demanda alrededor de datos.DEMANDAS.
+
+    Devuelve un arreglo (n_escenarios x len(datos.clientes)) en el orden de
+    datos.clientes, con cada demanda multiplicada por un factor en [1 - variacion, 1 + variacion].
+    """
+    rng = np.random.default_rng(semilla)
+    base = datos.DEMANDAS[datos.clientes]
+    factores = rng.uniform(1 - variacion, 1 + variacion, size=(n_escenarios, len(base)))
+    return np.rint(base * factores).astype(np.int64)
+
+
+def _demandas_por_nodo(datos: Datos, demandas):
+    """Convierte (escenarios x clientes) o (escenarios x nodos) a (escenarios x nodos)."""
+    demandas = np.asarray(demandas, dtype=np.int64)
+    if demandas.ndim != 2:
+        raise ValueError("Las demandas deben ser un arreglo (escenarios x clientes)")
+    if demandas.shape[1] == len(datos.NODOS):
+        return demandas
+    if demandas.shape[1] != len(datos.clientes):
+        raise ValueError(f"Se esperaban {len(datos.clientes)} demandas por escenario, "
+                         f"llegaron {demandas.shape[1]}")
+    por_nodo = np.zeros((demandas.shape[0], len(datos.NODOS)), dtype=np.int64)
+    por_nodo[:, datos.clientes] = demandas
+    return por_nodo
+
+
+def _resolver_escenario(args):
+    """Resuelve un escenario en el proceso trabajador (las matrices ya están compartidas)."""
+    parametros, opciones, demandas, rutas_arranque, semilla = args
+    datos = paralelo._DATOS
+    datos.DEMANDAS = demandas
+
+    sa = RecocidoSimulado(datos, rng=random.Random(semilla), **parametros)
+    solucion_inicial = None
+    if rutas_arranque is not None:
+        solucion_inicial = paralelo.importar_rutas(rutas_arranque, datos)
+    mejor = sa.optimizar(solucion_inicial=solucion_inicial, **opciones)
+
+    return {
+        'rutas': paralelo.exportar_rutas(mejor),
+        'costo': mejor.costo,
+        'costo_base': mejor.costo_base,
+        'es_valida': mejor.es_valida,
+        'rutas_activas': mejor.rutas_activas,
+        'pasos': sa.estadisticas['pasos'],
+        'tiempo': sa.estadisticas['tiempo'],
+    }
+
+
+def resolver_escenarios(recocido: RecocidoSimulado, demandas, salida=None, n_procesos=None,
+                        opciones_optimizar=None, factor_temp_arranque=0.2, semilla=None):
+    """
+    Resuelve un lote de escenarios de demanda en un pool de procesos.
+
+    - demandas: arreglo (escenarios x clientes), en el orden de datos.clientes.
+    - Las matrices se comparten una sola vez (memoria compartida o memmap de la caché).
+    - Los escenarios se resuelven en tandas de n_procesos; a partir de la segunda
+      tanda, cada escenario arranca en caliente desde la solución del escenario
+      ya resuelto con demandas más parecidas (distancia L1), con la temperatura
+      inicial multiplicada por factor_temp_arranque.
+    - opciones_optimizar se pasan a RecocidoSimulado.optimizar (p. ej. limite_tiempo).
+
+    Devuelve un DataFrame con una fila por escenario y, si se indica `salida`,
+    lo escribe en formato columnar Parquet.
+    """
+    import pandas as pd
+
+    datos = recocido.datos
+    demandas = _demandas_por_nodo(datos, demandas)
+    n_escenarios = len(demandas)
+    n_procesos = n_procesos or os.cpu_count()
+    opciones = opciones_optimizar or {}
+    rng = random.Random(semilla)
+
+    parametros_frio = recocido._parametros()
+    parametros_caliente = dict(parametros_frio, temp_inicial=recocido.T_inicial * factor_temp_arranque)
+
+    resultados = [None] * n_escenarios
+    arranques = [-1] * n_escenarios
+    resueltos = []
+
+    memorias, init_args = paralelo.compartir_matriz(datos)
+    try:
+        with Pool(n_procesos, initializer=paralelo._inicializar_trabajador, initargs=init_args) as pool:
+            for inicio in range(0, n_escenarios, n_procesos):
+                tanda = range(inicio, min(inicio + n_procesos, n_escenarios))
+                tareas = []
+                for e in tanda:
+                    rutas_arranque = None
+                    parametros = parametros_frio
+                    if resueltos:
+                        distancias = np.abs(demandas[resueltos] - demandas[e]).sum(axis=1)
+                        arranques[e] = resueltos[int(np.argmin(distancias))]
+                        rutas_arranque = resultados[arranques[e]]['rutas']
+                        parametros = parametros_caliente
+                    tareas.append((parametros, opciones, demandas[e], rutas_arranque, rng.getrandbits(32)))
+
+                for e, resultado in zip(tanda, pool.map(_resolver_escenario, tareas)):
+                    resultados[e] = resultado
+                resueltos.extend(tanda)
+    finally:
+        paralelo.liberar_matriz(memorias)
+
+    tabla = pd.DataFrame({
+        'escenario': np.arange(n_escenarios),
+        'arranque_desde': arranques,
+        'costo': [r['costo'] for r in resultados],
+        'costo_base': [r['costo_base'] for r in resultados],
+        'es_valida': [r['es_valida'] for r in resultados],
+        'rutas_activas': [r['rutas_activas'] for r in resultados],
+        'pasos': [r['pasos'] for r in resultados],
+        'tiempo': [r['tiempo'] for r in resultados],
+        'rutas': [_rutas_a_texto(datos, r['rutas']) for r in resultados],
+    })
+    if salida is not None:
+        tabla.to_parquet(salida, index=False)
+    return tabla
+
+
+def _rutas_a_texto(datos: Datos, rutas):
+    """'CDD1: TT3 -> TT7 | CDD2: ...' (solo rutas con clientes)."""
+    return " | ".join(f"{datos.nombre(d)}: {' -> '.join(datos.nombre(c) for c in clientes)}"
+                      for d, clientes in rutas if len(clientes))
+
+
+if __name__ == "__main__":
+
+    datos = Datos()
+    sa = RecocidoSimulado(datos, 100.0, 0.5, 0.95, 200, k_vecinos=10, pesos_operadores=PESOS_OPERADORES)
+
+    N_ESCENARIOS = 32
+    escenarios = generar_escenarios(datos, N_ESCENARIOS, variacion=0.2, semilla=0)
+
+    inicio = time.perf_counter()
+    tabla = resolver_escenarios(sa, escenarios, salida="resultados_escenarios.parquet", semilla=0)
+    print(tabla[['escenario', 'arranque_desde', 'costo_base', 'es_valida', 'tiempo']].to_string(index=False))
+    print(f"\n{N_ESCENARIOS} escenarios resueltos en {time.perf_counter() - inicio:.2f} s")
@@ -0,0 +1,428 @@
+import numpy as np
+from solucion import Solucion, PENALIZACION_RUTAS_INCOMPLETAS
+
+# Hasta esta longitud los tramos se suman con aritmética escalar (NumPy no compensa)
+LONGITUD_ESCALAR = 8
+
+
+def _nodo(ruta, pos):
+    """Nodo en la posición `pos` de la ruta; -1 y len(clientes) son el depósito."""
+    clientes = ruta.clientes
+    if 0 <= pos < len(clientes):
+        return clientes[pos]
+    return ruta.deposito
+
+
+class Movimiento:
+    """
+    Movimiento candidato sobre una Solucion.
+
+    El cambio de costo (delta) y la factibilidad se calculan al construir el
+    movimiento usando solo las aristas tocadas; la solución no se modifica
+    hasta llamar a aplicar(), y deshacer() la regresa al estado previo.
+    """
+    __slots__ = ('solucion', 'delta_base', 'delta', 'factible')
+
+    def __init__(self, solucion: Solucion):
+        self.solucion = solucion
+        self.delta_base = 0.0
+        self.delta = 0.0
+        self.factible = True
+
+    def aplicar(self):
+        """Aplica el movimiento sobre la solución y actualiza su costo."""
+        self._modificar_rutas()
+        self.solucion.costo_base += self.delta_base
+        # Se recalcula sobre costo_base para no acumular error con la penalización
+        self.solucion.costo = self.solucion._aplicar_penalizacion_rutas()
+
+    def deshacer(self):
+        """Revierte un movimiento aplicado."""
+        self._revertir_rutas()
+        self.solucion.costo_base -= self.delta_base
+        self.solucion.costo = self.solucion._aplicar_penalizacion_rutas()
+
+    def _modificar_rutas(self):
+        raise NotImplementedError
+
+    def _revertir_rutas(self):
+        raise NotImplementedError
+
+
+class Reubicar(Movimiento):
+    """
+    Mueve el cliente en la posición i de la ruta r1 a la posición j de la ruta r2.
+
+    La posición j se interpreta sobre la ruta destino ya sin el cliente movido.
+    """
+    __slots__ = ('r1', 'i', 'r2', 'j', 'delta_r1', 'delta_r2', 'demanda', 'cambio_activas')
+
+    def __init__(self, solucion: Solucion, r1, i, r2, j):
+        super().__init__(solucion)
+        self.r1, self.i, self.r2, self.j = r1, i, r2, j
+        self._evaluar()
+
+    def _evaluar(self):
+        sol = self.solucion
+        datos = sol.datos
+        C = datos.COSTO_MATRIX
+        ruta1 = sol.rutas[self.r1]
+        ruta2 = sol.rutas[self.r2]
+        i, j = self.i, self.j
+        cliente = ruta1.clientes[i]
+
+        # Quitar el cliente: p -> cliente -> n se convierte en p -> n
+        p = _nodo(ruta1, i - 1)
+        n = _nodo(ruta1, i + 1)
+        self.delta_r1 = C[p, n] - C[p, cliente] - C[cliente, n]
+
+        # Insertar el cliente entre a y b (vecinos en la ruta destino sin el cliente)
+        if self.r1 == self.r2:
+            a = _nodo(ruta1, j - 1 if j - 1 < i else j)
+            b = _nodo(ruta1, j if j < i else j + 1)
+        else:
+            a = _nodo(ruta2, j - 1)
+            b = _nodo(ruta2, j)
+        self.delta_r2 = C[a, cliente] + C[cliente, b] - C[a, b]
+        self.delta_base = self.delta_r1 + self.delta_r2
+
+        # Capacidad y penalización solo cambian entre rutas distintas
+        self.demanda = int(datos.DEMANDAS[cliente])
+        self.cambio_activas = 0
+        penalizacion = 0
+        if self.r1 != self.r2:
+            self.factible = ruta2.carga + self.demanda <= datos.CAPACIDAD_VEHICULO
+
+            self.cambio_activas = (len(ruta2.clientes) == 0) - (len(ruta1.clientes) == 1)
+            penalizacion = _penalizacion(sol, self.cambio_activas)
+        self.delta = self.delta_base + penalizacion
+
+    def _modificar_rutas(self):
+        rutas = self.solucion.rutas
+        ruta1, ruta2 = rutas[self.r1], rutas[self.r2]
+        cliente = ruta1.clientes.pop(self.i)
+        ruta2.clientes.insert(self.j, cliente)
+
+        ruta1.carga -= self.demanda
+        ruta2.carga += self.demanda
+        ruta1.costo += self.delta_r1
+        ruta2.costo += self.delta_r2
+        self.solucion.rutas_activas += self.cambio_activas
+        self.solucion.ruta_de[cliente] = self.r2
+
+    def _revertir_rutas(self):
+        rutas = self.solucion.rutas
+        ruta1, ruta2 = rutas[self.r1], rutas[self.r2]
+        cliente = ruta2.clientes.pop(self.j)
+        ruta1.clientes.insert(self.i, cliente)
+
+        ruta1.carga += self.demanda
+        ruta2.carga -= self.demanda
+        ruta1.costo -= self.delta_r1
+        ruta2.costo -= self.delta_r2
+        self.solucion.rutas_activas -= self.cambio_activas
+        self.solucion.ruta_de[cliente] = self.r1
+
+
+class DosOpt(Movimiento):
+    """Invierte el tramo de clientes [i, j] de la ruta r (2-opt intra-ruta)."""
+    __slots__ = ('r', 'i', 'j')
+
+    def __init__(self, solucion: Solucion, r, i, j):
+        super().__init__(solucion)
+        self.r, self.i, self.j = r, i, j
+        self._evaluar()
+
+    def _evaluar(self):
+        # Con matriz simétrica solo cambian las dos aristas de los extremos
+        C = self.solucion.datos.COSTO_MATRIX
+        ruta = self.solucion.rutas[self.r]
+        a = _nodo(ruta, self.i - 1)
+        b = _nodo(ruta, self.i)
+        c = _nodo(ruta, self.j)
+        d = _nodo(ruta, self.j + 1)
+        self.delta_base = C[a, c] + C[b, d] - C[a, b] - C[c, d]
+        self.delta = self.delta_base
+
+    def _invertir_tramo(self):
+        clientes = self.solucion.rutas[self.r].clientes
+        clientes[self.i:self.j + 1] = clientes[self.i:self.j + 1][::-1]
+
+    def _modificar_rutas(self):
+        self._invertir_tramo()
+        self.solucion.rutas[self.r].costo += self.delta_base
+
+    def _revertir_rutas(self):
+        # Invertir el mismo tramo otra vez lo deja como estaba
+        self._invertir_tramo()
+        self.solucion.rutas[self.r].costo -= self.delta_base
+
+
+def _penalizacion(solucion: Solucion, cambio_activas):
+    """Cambio en la penalización si el número de rutas activas cambia en `cambio_activas`."""
+    activas = solucion.rutas_activas
+    total = len(solucion.datos.DEPOSITOS_DISPONIBLES)
+    return (PENALIZACION_RUTAS_INCOMPLETAS * (activas + cambio_activas != total)
+            - PENALIZACION_RUTAS_INCOMPLETAS * (activas != total))
+
+
+def _costo_interno(C, tramo):
+    """Costo de las aristas internas de un tramo de clientes (array o vista NumPy)."""
+    if len(tramo) < 2:
+        return 0.0
+    if len(tramo) <= LONGITUD_ESCALAR:
+        return float(sum(C[tramo[k], tramo[k + 1]] for k in range(len(tramo) - 1)))
+    tramo = np.asarray(tramo)
+    return float(C[tramo[:-1], tramo[1:]].sum())
+
+
+def _demanda_tramo(demandas, tramo):
+    """Demanda total de un tramo de clientes (array o vista NumPy)."""
+    if len(tramo) <= LONGITUD_ESCALAR:
+        return sum(int(demandas[c]) for c in tramo)
+    return int(demandas[np.asarray(tramo)].sum())
+
+
+def _aristas_or_opt(C, ruta1, i, L, ruta2, j, invertir, misma_ruta):
+    """
+    Cambio en las aristas de los extremos al mover el tramo [i, i + L) de ruta1 a la
+    posición j de ruta2: (al quitarlo de ruta1, al insertarlo en ruta2). No incluye
+    las aristas internas del tramo. Solo aritmética escalar (ver pulido).
+    """
+    clientes = ruta1.clientes
+    primero, ultimo = clientes[i], clientes[i + L - 1]
+
+    # Quitar el tramo: p -> [tramo] -> n se convierte en p -> n
+    p = _nodo(ruta1, i - 1)
+    n = _nodo(ruta1, i + L)
+    quitar = C[p, n] - C[p, primero] - C[ultimo, n]
+
+    # Insertar el tramo entre a y b (vecinos en la ruta destino sin el tramo)
+    if misma_ruta:
+        a = _nodo(ruta1, j - 1 if j - 1 < i else j - 1 + L)
+        b = _nodo(ruta1, j if j < i else j + L)
+    else:
+        a = _nodo(ruta2, j - 1)
+        b = _nodo(ruta2, j)
+    if invertir:
+        primero, ultimo = ultimo, primero
+    return quitar, C[a, primero] + C[ultimo, b] - C[a, b]
+
+
+def _asignar_ruta(solucion: Solucion, clientes, r_idx):
+    ruta_de = solucion.ruta_de
+    for cliente in clientes:
+        ruta_de[cliente] = r_idx
+
+
+class OrOpt(Movimiento):
+    """
+    Mueve el tramo de `longitud` clientes que empieza en la posición i de la ruta r1
+    a la posición j de la ruta r2 (sobre la ruta destino ya sin el tramo),
+    opcionalmente invertido.
+    """
+    __slots__ = ('r1', 'i', 'longitud', 'r2', 'j', 'invertir',
+                 'delta_r1', 'delta_r2', 'demanda', 'cambio_activas')
+
+    def __init__(self, solucion: Solucion, r1, i, longitud, r2, j, invertir=False):
+        super().__init__(solucion)
+        self.r1, self.i, self.longitud = r1, i, longitud
+        self.r2, self.j, self.invertir = r2, j, invertir
+        self._evaluar()
+
+    def _evaluar(self):
+        sol = self.solucion
+        datos = sol.datos
+        C = datos.COSTO_MATRIX
+        ruta1 = sol.rutas[self.r1]
+        ruta2 = sol.rutas[self.r2]
+        i, L = self.i, self.longitud
+        # Los tramos de Or-opt son cortos: se cortan del array sin pasar por NumPy
+        tramo = ruta1.clientes[i:i + L]
+        interno = _costo_interno(C, tramo)
+        quitar, insertar = _aristas_or_opt(C, ruta1, i, L, ruta2, self.j, self.invertir, self.r1 == self.r2)
+        # Las aristas internas del tramo salen de r1 y entran a r2 (en el total se cancelan)
+        self.delta_r1 = quitar - interno
+        self.delta_r2 = insertar + interno
+        self.delta_base = self.delta_r1 + self.delta_r2
+
+        self.demanda = _demanda_tramo(datos.DEMANDAS, tramo)
+        self.cambio_activas = 0
+        if self.r1 != self.r2:
+            self.factible = ruta2.carga + self.demanda <= datos.CAPACIDAD_VEHICULO
+            self.cambio_activas = (len(ruta2.clientes) == 0) - (len(ruta1.clientes) == L)
+        self.delta = self.delta_base + _penalizacion(sol, self.cambio_activas)
+
+    def _mover(self, origen, i, destino, j, invertir, signo):
+        rutas = self.solucion.rutas
+        ruta_origen, ruta_destino = rutas[origen], rutas[destino]
+        tramo = ruta_origen.clientes[i:i + self.longitud]
+        del ruta_origen.clientes[i:i + self.longitud]
+        if invertir:
+            tramo.reverse()
+        ruta_destino.clientes[j:j] = tramo
+        _asignar_ruta(self.solucion, tramo, destino)
+
+        rutas[self.r1].carga -= signo * self.demanda
+        rutas[self.r2].carga += signo * self.demanda
+        rutas[self.r1].costo += signo * self.delta_r1
+        rutas[self.r2].costo += signo * self.delta_r2
+        self.solucion.rutas_activas += signo * self.cambio_activas
+
+    def _modificar_rutas(self):
+        self._mover(self.r1, self.i, self.r2, self.j, self.invertir, 1)
+
+    def _revertir_rutas(self):
+        self._mover(self.r2, self.j, self.r1, self.i, self.invertir, -1)
+
+
+class DosOptEstrella(Movimiento):
+    """
+    2-opt* entre rutas de CDD distintos: intercambia las colas de las rutas r1 y r2
+    a partir de las posiciones i y j (r1 = A[:i] + B[j:], r2 = B[:j] + A[i:]).
+    """
+    __slots__ = ('r1', 'i', 'r2', 'j', 'delta_r1', 'delta_r2', 'cambio_carga', 'cambio_activas')
+
+    def __init__(self, solucion: Solucion, r1, i, r2, j):
+        super().__init__(solucion)
+        self.r1, self.i, self.r2, self.j = r1, i, r2, j
+        self._evaluar()
+
+    def _evaluar(self):
+        sol = self.solucion
+        datos = sol.datos
+        C = datos.COSTO_MATRIX
+        ruta1 = sol.rutas[self.r1]
+        ruta2 = sol.rutas[self.r2]
+        cola1 = ruta1.indices()[self.i:]
+        cola2 = ruta2.indices()[self.j:]
+
+        # Aristas de entrada y de regreso al CDD de cada cola
+        p1 = _nodo(ruta1, self.i - 1)
+        p2 = _nodo(ruta2, self.j - 1)
+        d1, d2 = ruta1.deposito, ruta2.deposito
+        interno1 = _costo_interno(C, cola1)
+        interno2 = _costo_interno(C, cola2)
+        viejo1 = C[p1, cola1[0]] + interno1 + C[cola1[-1], d1] if len(cola1) else C[p1, d1]
+        viejo2 = C[p2, cola2[0]] + interno2 + C[cola2[-1], d2] if len(cola2) else C[p2, d2]
+        nuevo1 = C[p1, cola2[0]] + interno2 + C[cola2[-1], d1] if len(cola2) else C[p1, d1]
+        nuevo2 = C[p2, cola1[0]] + interno1 + C[cola1[-1], d2] if len(cola1) else C[p2, d2]
+        self.delta_r1 = nuevo1 - viejo1
+        self.delta_r2 = nuevo2 - viejo2
+        self.delta_base = self.delta_r1 + self.delta_r2
+
+        demandas = datos.DEMANDAS
+        self.cambio_carga = int(demandas[cola2].sum()) - int(demandas[cola1].sum())
+        capacidad = datos.CAPACIDAD_VEHICULO
+        self.factible = (ruta1.carga + self.cambio_carga <= capacidad
+                         and ruta2.carga - self.cambio_carga <= capacidad)
+
+        largo1 = self.i + len(cola2)
+        largo2 = self.j + len(cola1)
+        self.cambio_activas = ((largo1 > 0) - (len(ruta1.clientes) > 0)
+                               + (largo2 > 0) - (len(ruta2.clientes) > 0))
+        self.delta = self.delta_base + _penalizacion(sol, self.cambio_activas)
+
+    def _intercambiar_colas(self):
+        rutas = self.solucion.rutas
+        clientes1, clientes2 = rutas[self.r1].clientes, rutas[self.r2].clientes
+        cola1, cola2 = clientes1[self.i:], clientes2[self.j:]
+        del clientes1[self.i:]
+        del clientes2[self.j:]
+        clientes1.extend(cola2)
+        clientes2.extend(cola1)
+        _asignar_ruta(self.solucion, cola2, self.r1)
+        _asignar_ruta(self.solucion, cola1, self.r2)
+
+    def _modificar_rutas(self):
+        self._intercambiar_colas()
+        rutas = self.solucion.rutas
+        rutas[self.r1].carga += self.cambio_carga
+        rutas[self.r2].carga -= self.cambio_carga
+        rutas[self.r1].costo += self.delta_r1
+        rutas[self.r2].costo += self.delta_r2
+        self.solucion.rutas_activas += self.cambio_activas
+
+    def _revertir_rutas(self):
+        # Las colas quedaron en las mismas posiciones: intercambiarlas otra vez las regresa
+        self._intercambiar_colas()
+        rutas = self.solucion.rutas
+        rutas[self.r1].carga -= self.cambio_carga
+        rutas[self.r2].carga += self.cambio_carga
+        rutas[self.r1].costo -= self.delta_r1
+        rutas[self.r2].costo -= self.delta_r2
+        self.solucion.rutas_activas -= self.cambio_activas
+
+
+class IntercambioCruzado(Movimiento):
+    """
+    Cross-exchange: intercambia el tramo de l1 clientes en la posición i de la ruta r1
+    con el tramo de l2 clientes en la posición j de la ruta r2 (r1 != r2, uno de los
+    tramos puede estar vacío).
+    """
+    __slots__ = ('r1', 'i', 'l1', 'r2', 'j', 'l2',
+                 'delta_r1', 'delta_r2', 'cambio_carga', 'cambio_activas')
+
+    def __init__(self, solucion: Solucion, r1, i, l1, r2, j, l2):
+        super().__init__(solucion)
+        self.r1, self.i, self.l1 = r1, i, l1
+        self.r2, self.j, self.l2 = r2, j, l2
+        self._evaluar()
+
+    def _evaluar(self):
+        sol = self.solucion
+        datos = sol.datos
+        C = datos.COSTO_MATRIX
+        ruta1 = sol.rutas[self.r1]
+        ruta2 = sol.rutas[self.r2]
+        tramo1 = ruta1.clientes[self.i:self.i + self.l1]
+        tramo2 = ruta2.clientes[self.j:self.j + self.l2]
+        interno1 = _costo_interno(C, tramo1)
+        interno2 = _costo_interno(C, tramo2)
+
+        def enlace(a, tramo, interno, b):
+            # Costo de a -> [tramo] -> b
+            if len(tramo) == 0:
+                return C[a, b]
+            return C[a, tramo[0]] + interno + C[tramo[-1], b]
+
+        a1, b1 = _nodo(ruta1, self.i - 1), _nodo(ruta1, self.i + self.l1)
+        a2, b2 = _nodo(ruta2, self.j - 1), _nodo(ruta2, self.j + self.l2)
+        self.delta_r1 = enlace(a1, tramo2, interno2, b1) - enlace(a1, tramo1, interno1, b1)
+        self.delta_r2 = enlace(a2, tramo1, interno1, b2) - enlace(a2, tramo2, interno2, b2)
+        self.delta_base = self.delta_r1 + self.delta_r2
+
+        demandas = datos.DEMANDAS
+        self.cambio_carga = _demanda_tramo(demandas, tramo2) - _demanda_tramo(demandas, tramo1)
+        capacidad = datos.CAPACIDAD_VEHICULO
+        self.factible = (ruta1.carga + self.cambio_carga <= capacidad
+                         and ruta2.carga - self.cambio_carga <= capacidad)
+
+        largo1 = len(ruta1.clientes) - self.l1 + self.l2
+        largo2 = len(ruta2.clientes) - self.l2 + self.l1
+        self.cambio_activas = ((largo1 > 0) - (len(ruta1.clientes) > 0)
+                               + (largo2 > 0) - (len(ruta2.clientes) > 0))
+        self.delta = self.delta_base + _penalizacion(sol, self.cambio_activas)
+
+    def _intercambiar(self, l1, l2, signo):
+        rutas = self.solucion.rutas
+        clientes1, clientes2 = rutas[self.r1].clientes, rutas[self.r2].clientes
+        tramo1 = clientes1[self.i:self.i + l1]
+        tramo2 = clientes2[self.j:self.j + l2]
+        clientes1[self.i:self.i + l1] = tramo2
+        clientes2[self.j:self.j + l2] = tramo1
+        _asignar_ruta(self.solucion, tramo2, self.r1)
+        _asignar_ruta(self.solucion, tramo1, self.r2)
+
+        rutas[self.r1].carga += signo * self.cambio_carga
+        rutas[self.r2].carga -= signo * self.cambio_carga
+        rutas[self.r1].costo += signo * self.delta_r1
+        rutas[self.r2].costo += signo * self.delta_r2
+        self.solucion.rutas_activas += signo * self.cambio_activas
+
+    def _modificar_rutas(self):
+        self._intercambiar(self.l1, self.l2, 1)
+
+    def _revertir_rutas(self):
+        # Tras aplicar, la ruta r1 tiene l2 clientes en i y la r2 tiene l1 en j
+        self._intercambiar(self.l2, self.l1, -1)
@@ -0,0 +1,190 @@
+import copy
+import math
+import os
+import random
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+from recocido import RecocidoSimulado
+from solucion import Solucion, Ruta
+
+# Estado de cada proceso trabajador (se llena en _inicializar_trabajador)
+_DATOS = None
+_MEMORIAS = []
+
+# Matrices n x n de Datos que no se copian a cada trabajador
+MATRICES_COMPARTIDAS = ('COSTO_MATRIX', 'DISTANCIAS')
+
+
+def exportar_rutas(solucion: Solucion):
+    """Representación mínima y serializable de las rutas: [(deposito, clientes), ...]."""
+    return [(ruta.deposito, ruta.clientes) for ruta in solucion.rutas]
+
+
+def importar_rutas(rutas, datos):
+    """Reconstruye una Solucion a partir de exportar_rutas()."""
+    return Solucion([Ruta(deposito, clientes) for deposito, clientes in rutas], datos)
+
+
+def _archivo_npy(matriz):
+    """Ruta del .npy del que `matriz` es un memmap completo (p. ej. la caché de cargador); None si no lo es."""
+    archivo = getattr(matriz, 'filename', None)
+    if not isinstance(matriz, np.memmap) or archivo is None or not str(archivo).endswith('.npy'):
+        return None
+    # Un memmap también puede ser una vista parcial del archivo: solo sirve si coincide completo
+    completa = np.load(archivo, mmap_mode='r')
+    if (completa.shape, completa.dtype, completa.strides) != (matriz.shape, matriz.dtype, matriz.strides):
+        return None
+    return str(archivo)
+
+
+def compartir_matriz(datos):
+    """
+    Prepara las matrices de Datos (COSTO_MATRIX y DISTANCIAS) para los trabajadores
+    sin copiarlas en cada uno.
+
+    Si una matriz ya es un memmap de un .npy (Datos(usar_documentos=True)) solo
+    viaja la ruta del archivo y cada trabajador la vuelve a abrir con
+    mmap_mode='r'; si está en memoria, se copia una vez a memoria compartida.
+
+    Devuelve los bloques de memoria creados (el llamador debe liberarlos con
+    liberar_matriz()) y los argumentos de inicialización para los trabajadores:
+    una copia ligera de Datos sin las matrices y el origen de cada una.
+
+    Si los costos no son una matriz (p. ej. CostosBajoDemanda) no hay nada que
+    compartir: el proveedor viaja con Datos.
+    """
+    memorias = []
+    origenes = {}
+    datos_ligeros = copy.copy(datos)
+    # El rng por omisión de Datos es el módulo random, que no se puede serializar
+    # (con spawn o forkserver los initargs viajan por pickle); el trabajador lo repone
+    if datos_ligeros.rng is random:
+        datos_ligeros.rng = None
+    for atributo in MATRICES_COMPARTIDAS:
+        matriz = getattr(datos, atributo, None)
+        if not isinstance(matriz, np.ndarray):
+            continue
+        archivo = _archivo_npy(matriz)
+        if archivo is not None:
+            origenes[atributo] = ('archivo', archivo)
+        else:
+            memoria = shared_memory.SharedMemory(create=True, size=matriz.nbytes)
+            memorias.append(memoria)
+            np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=memoria.buf)[:] = matriz
+            origenes[atributo] = ('memoria', memoria.name, matriz.shape, matriz.dtype.str)
+        setattr(datos_ligeros, atributo, None)
+    return memorias, (datos_ligeros, origenes)
+
+
+def _inicializar_trabajador(datos, origenes):
+    """Conecta el proceso trabajador a las matrices compartidas o memory-mapped (sin copiarlas)."""
+    global _DATOS, _MEMORIAS
+    _MEMORIAS = []
+    for atributo, origen in origenes.items():
+        if origen[0] == 'archivo':
+            matriz = np.load(origen[1], mmap_mode='r')
+        else:
+            _, nombre_memoria, forma, tipo = origen
+            memoria = shared_memory.SharedMemory(name=nombre_memoria)
+            _MEMORIAS.append(memoria)
+            matriz = np.ndarray(forma, dtype=np.dtype(tipo), buffer=memoria.buf)
+        setattr(datos, atributo, matriz)
+    if datos.rng is None:
+        datos.rng = random
+    _DATOS = datos
+
+
+def liberar_matriz(memorias):
+    """Cierra y libera los bloques creados por compartir_matriz()."""
+    for memoria in memorias:
+        memoria.close()
+        memoria.unlink()
+
+
+def _ejecutar_cadena(args):
+    """Corre `pasos` pasos de Metropolis a temperatura fija T desde `rutas` (o desde cero)."""
+    parametros, rutas, T, pasos, semilla = args
+    sa = _crear_recocido(parametros, semilla)
+
+    if rutas is None:
+        solucion = sa._generar_solucion_inicial()
+    else:
+        solucion = importar_rutas(rutas, _DATOS)
+    mejor = solucion.copiar()
+
+    for _ in range(pasos):
+        if sa._paso_metropolis(solucion, T) and solucion.costo < mejor.costo:
+            mejor = solucion.copiar()
+
+    return exportar_rutas(solucion), solucion.costo, exportar_rutas(mejor), mejor.costo
+
+
+def _ejecutar_reinicio(args):
+    """Corre un recocido completo con su propia semilla."""
+    parametros, semilla = args
+    mejor = _crear_recocido(parametros, semilla).optimizar()
+    return exportar_rutas(mejor), mejor.costo
+
+
+def _crear_recocido(parametros, semilla):
+    return RecocidoSimulado(_DATOS, rng=random.Random(semilla), **parametros)
+
+
+def ejecutar_en_paralelo(recocido, n_cadenas=None, n_procesos=None, modo='templado',
+                         n_rondas=20, pasos_por_ronda=1000, semilla=None):
+    """Ver RecocidoSimulado.optimizar_paralelo."""
+    if modo not in ('templado', 'reinicios'):
+        raise ValueError(f"Modo desconocido: {modo!r}")
+
+    n_procesos = n_procesos or os.cpu_count()
+    n_cadenas = n_cadenas or n_procesos
+    rng = random.Random(semilla)
+    parametros = recocido._parametros()
+
+    memorias, init_args = compartir_matriz(recocido.datos)
+    try:
+        with Pool(n_procesos, initializer=_inicializar_trabajador, initargs=init_args) as pool:
+            if modo == 'reinicios':
+                tareas = [(parametros, rng.getrandbits(32)) for _ in range(n_cadenas)]
+                resultados = pool.map(_ejecutar_reinicio, tareas)
+                mejor_rutas, _ = min(resultados, key=lambda r: r[1])
+            else:
+                mejor_rutas = _templado_paralelo(pool, recocido, parametros, n_cadenas,
+                                                 n_rondas, pasos_por_ronda, rng)
+    finally:
+        liberar_matriz(memorias)
+
+    return importar_rutas(mejor_rutas, recocido.datos)
+
+
+def _templado_paralelo(pool, recocido, parametros, n_cadenas, n_rondas, pasos_por_ronda, rng):
+    """Bucle de rondas del templado paralelo; devuelve las rutas de la mejor solución vista."""
+    # Escalera geométrica de temperaturas, de la más caliente a la más fría
+    if n_cadenas > 1:
+        razon = (recocido.T_final / recocido.T_inicial) ** (1 / (n_cadenas - 1))
+    else:
+        razon = 1.0
+    temperaturas = [recocido.T_inicial * razon ** k for k in range(n_cadenas)]
+
+    estados = [None] * n_cadenas
+    energias = [math.inf] * n_cadenas
+    mejor_rutas, mejor_costo = None, math.inf
+
+    for ronda in range(n_rondas):
+        tareas = [(parametros, estados[k], temperaturas[k], pasos_por_ronda, rng.getrandbits(32))
+                  for k in range(n_cadenas)]
+
+        for k, (rutas, costo, rutas_mejor, costo_mejor) in enumerate(pool.map(_ejecutar_cadena, tareas)):
+            estados[k], energias[k] = rutas, costo
+            if costo_mejor < mejor_costo:
+                mejor_rutas, mejor_costo = rutas_mejor, costo_mejor
+
+        # Intercambio entre temperaturas vecinas (pares e impares alternados por ronda)
+        for k in range(ronda % 2, n_cadenas - 1, 2):
+            delta = (1 / temperaturas[k] - 1 / temperaturas[k + 1]) * (energias[k] - energias[k + 1])
+            if delta >= 0 or rng.random() < math.exp(delta):
+                estados[k], estados[k + 1] = estados[k + 1], estados[k]
+                energias[k], energias[k + 1] = energias[k + 1], energias[k]
+
+    return mejor_rutas
@@ -0,0 +1,142 @@
+import time
+from collections import deque
+from solucion import Solucion
+from movimientos import DosOpt, OrOpt, _nodo, _aristas_or_opt
+
+# Mejora mínima para aceptar un movimiento (evita ciclos por ruido de punto flotante)
+EPSILON = 1e-9
+
+
+def pulir_solucion(solucion: Solucion, vecinos=None, longitud_max_tramo=3, fecha_limite=None):
+    """
+    Búsqueda local determinista para después del recocido.
+
+    Lleva cada ruta a un óptimo local de 2-opt y Or-opt (intra-ruta) con primera
+    mejora. Para cada cliente u solo se prueban movimientos que dejan a u junto a
+    uno de sus vecinos de la misma ruta (`vecinos[u]`, p. ej. de
+    Datos.vecinos_cercanos; sin vecinos se prueban todos los nodos de la ruta).
+    Con "don't-look bits" solo se vuelve a revisar a los clientes cuyas aristas
+    cambiaron, así que cada ruta converge en tiempo casi lineal.
+
+    Con fecha_limite (instante de time.perf_counter()) el pulido se detiene al
+    alcanzarla y deja la solución como esté: cada mejora aplicada es completa.
+
+    Modifica la solución en su lugar (con los mismos movimientos del recocido, así
+    que costos y cachés quedan al día) y devuelve el número de mejoras aplicadas.
+    """
+    mejoras = 0
+    for r_idx in range(len(solucion.rutas)):
+        if fecha_limite is not None and time.perf_counter() >= fecha_limite:
+            break
+        if len(solucion.rutas[r_idx].clientes) > 2:
+            mejoras += _pulir_ruta(solucion, r_idx, vecinos, longitud_max_tramo, fecha_limite)
+    return mejoras
+
+
+def _pulir_ruta(solucion: Solucion, r_idx, vecinos, longitud_max_tramo, fecha_limite=None):
+    """Primera mejora con don't-look bits sobre la ruta r_idx (hasta fecha_limite, si se da)."""
+    ruta = solucion.rutas[r_idx]
+    ruta_de = solucion.ruta_de
+    posicion = {c: p for p, c in enumerate(ruta.clientes)}
+    activos = deque(ruta.clientes)
+    en_cola = set(ruta.clientes)
+    mejoras = 0
+
+    while activos:
+        if fecha_limite is not None and time.perf_counter() >= fecha_limite:
+            break
+        u = activos.popleft()
+        en_cola.discard(u)
+
+        candidatos = vecinos[u] if vecinos is not None else [ruta.deposito, *ruta.clientes]
+        for v in candidatos:
+            if v == u or ruta_de[v] != r_idx:
+                continue
+            # El depósito puede quedar junto a u por el inicio o por el final de la ruta
+            posiciones_v = (-1, len(ruta.clientes)) if v == ruta.deposito else (posicion[v],)
+
+            movimiento = None
+            for pv in posiciones_v:
+                movimiento = _mejor_movimiento(solucion, r_idx, posicion[u], pv, longitud_max_tramo)
+                if movimiento is not None:
+                    break
+            if movimiento is None:
+                continue
+
+            # Nodos cuyas aristas cambian: se reactivan antes y después de aplicar
+            tocados = _nodos_tocados(ruta, movimiento, aplicado=False)
+            movimiento.aplicar()
+            tocados.update(_nodos_tocados(ruta, movimiento, aplicado=True))
+            mejoras += 1
+
+            desde, hasta = _rango_modificado(movimiento)
+            for p in range(desde, hasta):
+                posicion[ruta.clientes[p]] = p
+            for nodo in tocados:
+                if nodo != ruta.deposito and nodo not in en_cola:
+                    activos.append(nodo)
+                    en_cola.add(nodo)
+            break
+
+    return mejoras
+
+
+def _mejor_movimiento(solucion, r_idx, pu, pv, longitud_max_tramo):
+    """
+    Primer movimiento que mejora y deja al cliente en la posición pu junto al nodo
+    en la posición pv (-1 o len(clientes) = depósito). Devuelve None si no hay.
+    """
+    ruta = solucion.rutas[r_idx]
+    C = solucion.datos.COSTO_MATRIX
+    n = len(ruta.clientes)
+
+    # --- 2-opt: invertir [i, j] crea las aristas (i-1, j) y (i, j+1) ---
+    a, b = min(pu, pv), max(pu, pv)
+    for i, j in ((a + 1, b), (a, b - 1)):
+        if 0 <= i < j < n:
+            movimiento = DosOpt(solucion, r_idx, i, j)
+            if movimiento.delta < -EPSILON:
+                return movimiento
+
+    # --- Or-opt: tramo que empieza o termina en u, reinsertado junto a v ---
+    for longitud in range(1, min(longitud_max_tramo, n - 1) + 1):
+        for inicio in {pu, pu - longitud + 1}:
+            if inicio < 0 or inicio + longitud > n or inicio <= pv < inicio + longitud:
+                continue
+            # Posición de v en la ruta sin el tramo
+            pv_sin = pv if pv < inicio else pv - longitud
+            u_al_frente = inicio == pu
+            for invertir in (False, True):
+                # u queda al principio del tramo insertado -> va después de v; si no, antes
+                despues = u_al_frente != invertir
+                j = pv_sin + 1 if despues else pv_sin
+                if not 0 <= j <= n - longitud or (j == inicio and not invertir):
+                    continue
+                # Dentro de la ruta no cambian carga ni rutas activas: basta el delta de
+                # las aristas, y el OrOpt solo se construye si mejora
+                quitar, insertar = _aristas_or_opt(C, ruta, inicio, longitud, ruta, j, invertir, True)
+                if quitar + insertar < -EPSILON:
+                    return OrOpt(solucion, r_idx, inicio, longitud, r_idx, j, invertir)
+    return None
+
+
+def _nodos_tocados(ruta, movimiento, aplicado):
+    """
+    Extremos de las aristas que rompe (antes de aplicar) o crea (después) el movimiento.
+    En Or-opt el tramo está en la posición i antes de aplicarse y en j después.
+    """
+    if isinstance(movimiento, DosOpt):
+        posiciones = (movimiento.i - 1, movimiento.i, movimiento.j, movimiento.j + 1)
+    else:
+        i = movimiento.j if aplicado else movimiento.i
+        longitud = movimiento.longitud
+        posiciones = (i - 1, i, i + longitud - 1, i + longitud)
+    return {_nodo(ruta, p) for p in posiciones}
+
+
+def _rango_modificado(movimiento):
+    """Posiciones [desde, hasta) de la ruta cuyos clientes cambiaron de lugar al aplicar el movimiento."""
+    if isinstance(movimiento, DosOpt):
+        return movimiento.i, movimiento.j + 1
+    # Or-opt intra-ruta: el tramo sale de i y entra en j; lo que hay entre ambos se recorre
+    return min(movimiento.i, movimiento.j), max(movimiento.i, movimiento.j) + movimiento.longitud
@@ -1,177 +1,534 @@
 import random
 import math
-import copy
+import time
+from itertools import accumulate
 from datos import Datos
-from solucion import Solucion
+from solucion import Solucion, Ruta
+from movimientos import Reubicar, DosOpt, OrOpt, DosOptEstrella, IntercambioCruzado
+from pulido import pulir_solucion
+
+# Pesos por defecto de la biblioteca de operadores (ver pesos_operadores)
+PESOS_OPERADORES = {
+    'reubicar': 0.30,
+    'dos_opt': 0.25,
+    'or_opt': 0.15,
+    'dos_opt_estrella': 0.15,
+    'intercambio_cruzado': 0.15,
+}
+
+# Longitud máxima de los tramos que mueven Or-opt y cross-exchange
+LONGITUD_MAX_TRAMO = 3
+
+# Con limite_tiempo, el reloj se consulta cada tantos pasos dentro de un nivel
+PASOS_ENTRE_RELOJ = 256
 
 class RecocidoSimulado:
     """Implementa el algoritmo de Recocido Simulado para el MDVRP."""
     
-    def __init__(self, datos: Datos, temp_inicial, temp_final, factor_enfriamiento, iter_por_temp):
+    def __init__(self, datos: Datos, temp_inicial, temp_final, factor_enfriamiento, iter_por_temp,
+                 k_vecinos=None, pesos_operadores=None, rng=None):
         self.datos = datos
+        # Generador de números aleatorios (random.Random(semilla) para corridas
+        # reproducibles); por omisión se usa el módulo random global
+        self.rng = rng if rng is not None else random
         self.T_inicial = temp_inicial
         self.T_final = temp_final
         self.alpha = factor_enfriamiento
         self.iter_por_temp = iter_por_temp
+        
+        # Vecindario granular: si se indica k_vecinos, los movimientos solo colocan
+        # a un cliente junto a uno de sus k nodos más cercanos
+        self.k_vecinos = k_vecinos
+        self.vecinos = datos.vecinos_cercanos(k_vecinos).tolist() if k_vecinos else None
+        
+        # Biblioteca de operadores: {nombre: peso}. Sin pesos se usa el vecindario
+        # original (reubicar entre CDD + 2-opt)
+        self.pesos_operadores = pesos_operadores
+        if pesos_operadores:
+            desconocidos = set(pesos_operadores) - set(PESOS_OPERADORES)
+            if desconocidos:
+                raise ValueError(f"Operadores desconocidos: {sorted(desconocidos)}")
+            self._operadores = [getattr(self, f'_vecino_{nombre}') for nombre in pesos_operadores]
+            self._pesos_acumulados = list(accumulate(pesos_operadores.values()))
+
+    def _parametros(self):
+        """Argumentos del constructor (sin datos), para recrear el recocido en otro proceso."""
+        return {
+            'temp_inicial': self.T_inicial,
+            'temp_final': self.T_final,
+            'factor_enfriamiento': self.alpha,
+            'iter_por_temp': self.iter_por_temp,
+            'k_vecinos': self.k_vecinos,
+            'pesos_operadores': self.pesos_operadores,
+        }
 
     def _generar_solucion_inicial(self):
         """Genera una solución inicial (heurística de asignación al CDD más cercano)."""
         clientes_a_asignar = self.datos.clientes[:]
-        random.shuffle(clientes_a_asignar)
+        self.rng.shuffle(clientes_a_asignar)
         
-        solucion_mapa = {d: {'deposito': d, 'clientes': []} 
-                         for d in self.datos.DEPOSITOS_DISPONIBLES}
+        solucion_mapa = {d: Ruta(d) for d in self.datos.DEPOSITOS_DISPONIBLES}
         
         for cliente in clientes_a_asignar:
-            demanda = self.datos.DEMANDAS[cliente]
+            demanda = int(self.datos.DEMANDAS[cliente])
             mejor_deposito = None
             mejor_costo = float('inf')
             
             for d in self.datos.DEPOSITOS_DISPONIBLES:
-                costo = self.datos.COSTO_MATRIX[d][cliente] 
-                
-                capacidad_usada = sum(self.datos.DEMANDAS[c] for c in solucion_mapa[d]['clientes'])
+                costo = self.datos.COSTO_MATRIX[d, cliente] 
                 
-                if capacidad_usada + demanda <= self.datos.CAPACIDAD_VEHICULO:
+                if solucion_mapa[d].carga + demanda <= self.datos.CAPACIDAD_VEHICULO:
                     if costo < mejor_costo:
                         mejor_costo = costo
                         mejor_deposito = d
             
-            if mejor_deposito:
-                solucion_mapa[mejor_deposito]['clientes'].append(cliente)
+            if mejor_deposito is not None:
+                solucion_mapa[mejor_deposito].clientes.append(cliente)
+                solucion_mapa[mejor_deposito].carga += demanda
         
-        rutas_formateadas = [{'deposito': d_info['deposito'], 'clientes': d_info['clientes']} 
-                             for d_info in solucion_mapa.values() if d_info['clientes']]
+        # Se conserva una ruta por CDD (aunque quede vacía) para poder mover clientes entre ellas
+        rutas_formateadas = list(solucion_mapa.values())
         
         return Solucion(rutas_formateadas, self.datos)
 
+    def _mejor_insercion(self, rutas, cliente, respetar_capacidad=True):
+        """(ruta, posición) de inserción más barata de `cliente`; None si ninguna ruta sirve."""
+        C = self.datos.COSTO_MATRIX
+        demanda = int(self.datos.DEMANDAS[cliente])
+        capacidad = self.datos.CAPACIDAD_VEHICULO
+        mejor = None
+        mejor_costo = float('inf')
+        for ruta in rutas:
+            if respetar_capacidad and ruta.carga + demanda > capacidad:
+                continue
+            nodos = [ruta.deposito] + list(ruta.clientes) + [ruta.deposito]
+            for pos in range(len(nodos) - 1):
+                a, b = nodos[pos], nodos[pos + 1]
+                costo = C[a, cliente] + C[cliente, b] - C[a, b]
+                if costo < mejor_costo:
+                    mejor_costo = costo
+                    mejor = (ruta, pos)
+        return mejor
+
+    def _reparar_capacidad(self, solucion: Solucion):
+        """
+        Devuelve una copia de `solucion` sin perder clientes: saca clientes del final de
+        las rutas sobrecargadas y los reinserta en la posición más barata de una ruta con
+        espacio. Si ninguna ruta tiene espacio (demanda total ajustada), el cliente va a la
+        posición más barata de cualquier ruta y la solución queda completa pero no válida.
+        """
+        demandas = self.datos.DEMANDAS
+        capacidad = self.datos.CAPACIDAD_VEHICULO
+        rutas = [ruta.copiar() for ruta in solucion.rutas]
+        if not rutas:
+            raise ValueError("La solución no tiene rutas donde reinsertar clientes")
+        
+        sueltos = []
+        for ruta in rutas:
+            while ruta.carga > capacidad:
+                cliente = ruta.clientes.pop()
+                ruta.carga -= int(demandas[cliente])
+                sueltos.append(cliente)
+        
+        # Los de mayor demanda primero, mientras hay más espacio
+        sueltos.sort(key=lambda c: demandas[c], reverse=True)
+        for cliente in sueltos:
+            mejor = self._mejor_insercion(rutas, cliente)
+            if mejor is None:
+                mejor = self._mejor_insercion(rutas, cliente, respetar_capacidad=False)
+            ruta, pos = mejor
+            ruta.clientes.insert(pos, cliente)
+            ruta.carga += int(demandas[cliente])
+        
+        return Solucion(rutas, self.datos)
+
     def _generar_vecino_aleatorio(self, solucion_actual: Solucion):
-        """Genera un vecino aleatorio con movimientos inter-depósito o intra-ruta."""
+        """
+        Genera un movimiento aleatorio inter-depósito o intra-ruta.
+
+        Devuelve un Movimiento ya evaluado (sin aplicar) o None si no se
+        encontró un movimiento factible.
+        """
+        if self.pesos_operadores:
+            operador = self.rng.choices(self._operadores, cum_weights=self._pesos_acumulados)[0]
+            movimiento = operador(solucion_actual)
+            return movimiento if movimiento and movimiento.factible else None
+        
+        if self.vecinos is not None:
+            return self._generar_vecino_granular(solucion_actual)
         
         sol = solucion_actual.rutas
         
-        # 1. Movimiento Inter-Depósito (Swap) - 60% probabilidad
-        if len(sol) >= 1 and random.random() < 0.6: 
-            r1_idx = random.randint(0, len(sol) - 1)
-            r1_info = sol[r1_idx]
-            r1_clientes = r1_info['clientes']
+        # 1. Movimiento Inter-Depósito (Reubicar) - 60% probabilidad
+        if len(sol) >= 1 and self.rng.random() < 0.6: 
+            r1_idx = self.rng.randint(0, len(sol) - 1)
+            r1_clientes = sol[r1_idx].clientes
             
             if r1_clientes:
-                c1_idx = random.randint(0, len(r1_clientes) - 1)
-                cliente_movido = r1_clientes[c1_idx]
-                
-                depositos_destino = self.datos.DEPOSITOS_DISPONIBLES 
-                d2 = random.choice(depositos_destino)
+                c1_idx = self.rng.randint(0, len(r1_clientes) - 1)
+                r2_idx = self.rng.randint(0, len(sol) - 1)
 
-                nuevas_rutas = copy.deepcopy(sol)
-                r1_nueva_clientes = r1_clientes[:c1_idx] + r1_clientes[c1_idx+1:]
-                
-                r2_info = next((r for r in nuevas_rutas if r['deposito'] == d2), None)
-                
-                if r1_info['deposito'] != d2:
-                    if r2_info:
-                        r2_idx = nuevas_rutas.index(r2_info)
-                        r2_nueva_clientes = r2_info['clientes'][:]
-                        c2_idx = random.randint(0, len(r2_nueva_clientes))
-                        r2_nueva_clientes.insert(c2_idx, cliente_movido)
-                        
-                        nuevas_rutas[r1_idx]['clientes'] = r1_nueva_clientes
-                        nuevas_rutas[r2_idx]['clientes'] = r2_nueva_clientes
-                    else:
-                        nuevas_rutas[r1_idx]['clientes'] = r1_nueva_clientes
-                        nuevas_rutas.append({'deposito': d2, 'clientes': [cliente_movido]})
-                
-                nuevas_rutas_limpia = [r for r in nuevas_rutas if r['clientes']]
-                vecino = Solucion(nuevas_rutas_limpia, self.datos)
-                if vecino.es_valida: return vecino
+                if r1_idx != r2_idx:
+                    c2_idx = self.rng.randint(0, len(sol[r2_idx].clientes))
+                    movimiento = Reubicar(solucion_actual, r1_idx, c1_idx, r2_idx, c2_idx)
+                    if movimiento.factible: return movimiento
 
         # 2. Movimiento Intra-Ruta (2-opt) - 40% probabilidad
-        if len(sol) > 0 and random.random() < 0.8: 
-            r_idx = random.randint(0, len(sol) - 1)
-            ruta_info = sol[r_idx]
-            ruta = ruta_info['clientes']
-            L = len(ruta)
+        if len(sol) > 0 and self.rng.random() < 0.8: 
+            r_idx = self.rng.randint(0, len(sol) - 1)
+            L = len(sol[r_idx].clientes)
             
             if L >= 2:
-                i, j = sorted(random.sample(range(L), 2))
-                
-                nueva_ruta_clientes = ruta[:i] + ruta[i:j+1][::-1] + ruta[j+1:]
-                
-                nuevas_rutas = copy.deepcopy(sol)
-                nuevas_rutas[r_idx]['clientes'] = nueva_ruta_clientes
-                
-                vecino = Solucion(nuevas_rutas, self.datos)
-                return vecino
+                i, j = sorted(self.rng.sample(range(L), 2))
+                return DosOpt(solucion_actual, r_idx, i, j)
+        
+        return None
+
+    def _generar_vecino_granular(self, solucion_actual: Solucion):
+        """Genera un movimiento que deja a un cliente junto a uno de sus vecinos cercanos."""
+        cliente = self.rng.choice(self.datos.clientes)
+        vecino = self.rng.choice(self.vecinos[cliente])
+        r1_idx = solucion_actual.ruta_de[cliente]
+        r2_idx = solucion_actual.ruta_de[vecino]
+        if r1_idx < 0 or r2_idx < 0:
+            return None
+        
+        sol = solucion_actual.rutas
+        ruta2 = sol[r2_idx]
+        c1_idx = sol[r1_idx].clientes.index(cliente)
+        
+        # 1. Reubicar el cliente antes o después de su vecino - 60% probabilidad
+        if self.rng.random() < 0.6:
+            if vecino == ruta2.deposito:
+                # Al inicio o al final de la ruta (la posición es sin el cliente movido)
+                c2_idx = 0 if self.rng.random() < 0.5 else len(ruta2.clientes) - (r1_idx == r2_idx)
+            else:
+                c2_idx = ruta2.clientes.index(vecino)
+                if r1_idx == r2_idx and c2_idx > c1_idx:
+                    c2_idx -= 1
+                if self.rng.random() < 0.5:
+                    c2_idx += 1
+            
+            movimiento = Reubicar(solucion_actual, r1_idx, c1_idx, r2_idx, c2_idx)
+            if movimiento.factible: return movimiento
         
-        return solucion_actual.copiar() 
+        # 2. 2-opt que crea la arista cliente-vecino dentro de la misma ruta
+        if r1_idx == r2_idx and vecino != ruta2.deposito and self.rng.random() < 0.8:
+            v_idx = ruta2.clientes.index(vecino)
+            if c1_idx < v_idx - 1:
+                return DosOpt(solucion_actual, r1_idx, c1_idx + 1, v_idx)
+            if v_idx < c1_idx - 1:
+                return DosOpt(solucion_actual, r1_idx, v_idx, c1_idx - 1)
+        
+        return None
+
+    # --- Biblioteca de operadores (cada uno devuelve un Movimiento evaluado o None) ---
+
+    def _elegir_cliente(self, solucion_actual: Solucion):
+        """Elige un cliente asignado al azar; devuelve (índice de ruta, posición) o None."""
+        cliente = self.rng.choice(self.datos.clientes)
+        r_idx = solucion_actual.ruta_de[cliente]
+        if r_idx < 0:
+            return None
+        return r_idx, solucion_actual.rutas[r_idx].clientes.index(cliente)
 
-    def optimizar(self):
-        """Ejecuta el algoritmo de Recocido Simulado con la impresión solicitada."""
+    def _elegir_destino(self, solucion_actual: Solucion, cliente):
+        """
+        Elige una ruta y una posición de inserción (sobre la ruta tal como está).
+
+        Con listas de candidatos la posición queda junto a un vecino cercano del
+        cliente; sin ellas, la ruta y la posición son aleatorias.
+        """
+        rutas = solucion_actual.rutas
+        if self.vecinos is None:
+            r_idx = self.rng.randint(0, len(rutas) - 1)
+            return r_idx, self.rng.randint(0, len(rutas[r_idx].clientes))
+        
+        vecino = self.rng.choice(self.vecinos[cliente])
+        r_idx = solucion_actual.ruta_de[vecino]
+        if r_idx < 0:
+            return None
+        ruta = rutas[r_idx]
+        if vecino == ruta.deposito:
+            return r_idx, 0 if self.rng.random() < 0.5 else len(ruta.clientes)
+        pos = ruta.clientes.index(vecino)
+        if self.rng.random() < 0.5:
+            pos += 1
+        return r_idx, pos
+
+    def _vecino_reubicar(self, solucion_actual: Solucion):
+        origen = self._elegir_cliente(solucion_actual)
+        if origen is None: return None
+        r1_idx, i = origen
+        destino = self._elegir_destino(solucion_actual, solucion_actual.rutas[r1_idx].clientes[i])
+        if destino is None: return None
+        r2_idx, pos = destino
+        
+        if r1_idx == r2_idx:
+            if pos in (i, i + 1):
+                return None
+            if pos > i:
+                pos -= 1
+        return Reubicar(solucion_actual, r1_idx, i, r2_idx, pos)
+
+    def _vecino_dos_opt(self, solucion_actual: Solucion):
+        origen = self._elegir_cliente(solucion_actual)
+        if origen is None: return None
+        r_idx, i = origen
+        clientes = solucion_actual.rutas[r_idx].clientes
+        
+        if self.vecinos is None:
+            if len(clientes) < 2:
+                return None
+            i, j = sorted(self.rng.sample(range(len(clientes)), 2))
+            return DosOpt(solucion_actual, r_idx, i, j)
         
-        solucion_actual = self._generar_solucion_inicial()
+        # Crear la arista cliente-vecino dentro de la misma ruta
+        vecino = self.rng.choice(self.vecinos[clientes[i]])
+        if solucion_actual.ruta_de[vecino] != r_idx or vecino == solucion_actual.rutas[r_idx].deposito:
+            return None
+        v = clientes.index(vecino)
+        if i < v - 1:
+            return DosOpt(solucion_actual, r_idx, i + 1, v)
+        if v < i - 1:
+            return DosOpt(solucion_actual, r_idx, v, i - 1)
+        return None
+
+    def _vecino_or_opt(self, solucion_actual: Solucion):
+        origen = self._elegir_cliente(solucion_actual)
+        if origen is None: return None
+        r1_idx, i = origen
+        clientes = solucion_actual.rutas[r1_idx].clientes
+        longitud = self.rng.randint(1, min(LONGITUD_MAX_TRAMO, len(clientes) - i))
+        destino = self._elegir_destino(solucion_actual, clientes[i])
+        if destino is None: return None
+        r2_idx, pos = destino
+        
+        if r1_idx == r2_idx:
+            if i <= pos <= i + longitud:
+                return None
+            if pos > i:
+                pos -= longitud
+        return OrOpt(solucion_actual, r1_idx, i, longitud, r2_idx, pos, invertir=self.rng.random() < 0.5)
+
+    def _vecino_dos_opt_estrella(self, solucion_actual: Solucion):
+        origen = self._elegir_cliente(solucion_actual)
+        if origen is None: return None
+        r1_idx, i = origen
+        destino = self._elegir_destino(solucion_actual, solucion_actual.rutas[r1_idx].clientes[i])
+        if destino is None: return None
+        r2_idx, pos = destino
+        if r1_idx == r2_idx:
+            return None
+        
+        # Cortar después del cliente y antes de la posición destino
+        return DosOptEstrella(solucion_actual, r1_idx, i + 1, r2_idx, pos)
+
+    def _vecino_intercambio_cruzado(self, solucion_actual: Solucion):
+        origen = self._elegir_cliente(solucion_actual)
+        if origen is None: return None
+        r1_idx, i = origen
+        clientes1 = solucion_actual.rutas[r1_idx].clientes
+        destino = self._elegir_destino(solucion_actual, clientes1[i])
+        if destino is None: return None
+        r2_idx, pos = destino
+        if r1_idx == r2_idx:
+            return None
+        
+        l1 = self.rng.randint(1, min(LONGITUD_MAX_TRAMO, len(clientes1) - i))
+        l2 = self.rng.randint(0, min(LONGITUD_MAX_TRAMO, len(solucion_actual.rutas[r2_idx].clientes) - pos))
+        return IntercambioCruzado(solucion_actual, r1_idx, i, l1, r2_idx, pos, l2)
+
+    def _paso_metropolis(self, solucion_actual: Solucion, T):
+        """
+        Genera un movimiento y lo aplica si el criterio de Metropolis lo acepta.
+
+        Devuelve True si el movimiento mejoró la solución actual.
+        """
+        movimiento = self._generar_vecino_aleatorio(solucion_actual)
+        delta_E = movimiento.delta if movimiento else 0.0
+
+        # --- Lógica de Aceptación/Mejora (Metropolis: e^-(Delta/T)) ---
+        if delta_E < 0:
+            movimiento.aplicar()
+            return True
+
+        probabilidad_aceptacion = math.exp(-delta_E / T)
+        
+        if movimiento and self.rng.random() < probabilidad_aceptacion:
+            movimiento.aplicar()
+        return False
+
+    def optimizar(self, limite_tiempo=None, max_pasos=None, callback=None,
+                  pasos_estancamiento=None, recalentar_tras=None, factor_recalentamiento=0.5,
+                  solucion_inicial=None, pulir=True):
+        """
+        Ejecuta el algoritmo de Recocido Simulado y devuelve la mejor solución encontrada.
+        
+        Si se da solucion_inicial (arranque en caliente) se parte de una copia de
+        ella, reparada con _reparar_capacidad si no cumple la capacidad; si no, se
+        usa la heurística del CDD más cercano.
+        
+        Criterios de parada (el primero que se cumpla):
+        - la temperatura llega a T_final;
+        - limite_tiempo: segundos de reloj (se revisa también cada PASOS_ENTRE_RELOJ
+          pasos dentro del nivel, así que un nivel largo no se pasa del límite);
+        - max_pasos: número total de pasos de Metropolis;
+        - pasos_estancamiento: pasos seguidos sin mejorar la mejor solución;
+        - callback devuelve True.
+        
+        callback(progreso) se llama al terminar cada nivel de temperatura (fuera del
+        bucle interno) con un diccionario: 'nivel', 'paso', 'T', 'costo_actual',
+        'mejor_costo', 'tiempo' y 'recalentamientos'.
+        
+        Recalentamiento: con recalentar_tras=n, si la mejor solución no mejora en n
+        niveles seguidos, T sube a T_inicial * factor_recalentamiento ** k en el
+        k-ésimo recalentamiento (cada vez más bajo, así que el recocido termina).
+        
+        Con pulir=True, la mejor solución pasa al final por self.pulir() (2-opt y
+        Or-opt deterministas por ruta hasta un óptimo local); con limite_tiempo, el
+        pulido solo usa lo que quede del presupuesto.
+        
+        Al terminar, self.estadisticas guarda pasos, tiempo, motivo de parada,
+        número de recalentamientos y mejoras y tiempo del pulido.
+        """
+        inicio = time.perf_counter()
+        
+        if solucion_inicial is None:
+            solucion_actual = self._generar_solucion_inicial()
+        elif solucion_inicial.es_valida:
+            solucion_actual = solucion_inicial.copiar()
+        else:
+            solucion_actual = self._reparar_capacidad(solucion_inicial)
         mejor_solucion_global = solucion_actual.copiar()
         T = self.T_inicial
 
         paso_total = 0 
-        IMPRESION_INTERVALO = 1000 # Imprimir cada 1000 pasos
-
-        # 1. Impresión del encabezado
-        print(f"--- INICIO DEL RECOCIDO SIMULADO (Factor de Enfriamiento: {self.alpha}) ---")
+        nivel = 0
+        ultimo_paso_mejora = 0
+        niveles_sin_mejora = 0
+        recalentamientos = 0
+        motivo = 'temperatura_final'
 
         while T > self.T_final:
             
-            for _ in range(self.iter_por_temp):
-                
-                vecino = self._generar_vecino_aleatorio(solucion_actual)
-                delta_E = vecino.costo - solucion_actual.costo 
-                
-                paso_total += 1
-                
-                # --- CONTROL DE IMPRESIÓN PERSONALIZADO (Primeros 10 y luego cada 1000) ---
-                imprimir_paso = False
-                
-                if paso_total <= 10:
-                    imprimir_paso = True
-                elif (paso_total > 10) and ((paso_total - 10) % IMPRESION_INTERVALO == 0):
-                    imprimir_paso = True
-
-                if imprimir_paso:
-                    # LÍNEA DE IMPRESIÓN: Muestra solo Costo y T
-                    print(f"Paso {paso_total:<5} -> Costo=${solucion_actual.costo_base:,.2f} | T={T:.2f}")
-
-                # --- Lógica de Aceptación/Mejora (Metropolis: e^-(Delta/T)) ---
-                if delta_E < 0:
-                    solucion_actual = vecino
-                    
+            pasos_nivel = self.iter_por_temp
+            if max_pasos is not None:
+                pasos_nivel = min(pasos_nivel, max_pasos - paso_total)
+            
+            mejoro_nivel = False
+            pasos_hechos = 0
+            while pasos_hechos < pasos_nivel:
+                pasos_hechos += 1
+                if self._paso_metropolis(solucion_actual, T):
                     if solucion_actual.costo < mejor_solucion_global.costo:
                         mejor_solucion_global = solucion_actual.copiar()
-                else:
-                    probabilidad_aceptacion = math.exp(-delta_E / T)
-                    
-                    if random.random() < probabilidad_aceptacion:
-                        solucion_actual = vecino
+                        ultimo_paso_mejora = paso_total + pasos_hechos
+                        mejoro_nivel = True
+                # Un nivel largo no debe pasarse del límite de tiempo: se corta a medias
+                if (limite_tiempo is not None and pasos_hechos % PASOS_ENTRE_RELOJ == 0
+                        and time.perf_counter() - inicio >= limite_tiempo):
+                    break
+
+            paso_total += pasos_hechos
+            nivel += 1
+            tiempo = time.perf_counter() - inicio
+            
+            # --- Progreso y criterios de parada (una vez por nivel de temperatura) ---
+            if callback is not None:
+                progreso = {
+                    'nivel': nivel,
+                    'paso': paso_total,
+                    'T': T,
+                    'costo_actual': solucion_actual.costo,
+                    'mejor_costo': mejor_solucion_global.costo,
+                    'tiempo': tiempo,
+                    'recalentamientos': recalentamientos,
+                }
+                if callback(progreso):
+                    motivo = 'callback'
+                    break
+            
+            if max_pasos is not None and paso_total >= max_pasos:
+                motivo = 'max_pasos'
+                break
+            if limite_tiempo is not None and tiempo >= limite_tiempo:
+                motivo = 'limite_tiempo'
+                break
+            if pasos_estancamiento is not None and paso_total - ultimo_paso_mejora >= pasos_estancamiento:
+                motivo = 'estancamiento'
+                break
 
             T *= self.alpha
+            
+            # --- Recalentamiento por estancamiento ---
+            niveles_sin_mejora = 0 if mejoro_nivel else niveles_sin_mejora + 1
+            if recalentar_tras and niveles_sin_mejora >= recalentar_tras:
+                T_recalentada = self.T_inicial * factor_recalentamiento ** (recalentamientos + 1)
+                if T_recalentada > T:
+                    T = T_recalentada
+                    recalentamientos += 1
+                niveles_sin_mejora = 0
         
-        # 2. Impresión de la finalización
-        print(f"--- FIN DEL RECOCIDO SIMULADO (Total Pasos: {paso_total}) ---")
-
+        # El pulido cuenta dentro de limite_tiempo: se corta al agotarse (o no se hace)
+        inicio_pulido = time.perf_counter()
+        fecha_limite = inicio + limite_tiempo if limite_tiempo is not None else None
+        mejoras_pulido = self.pulir(mejor_solucion_global, fecha_limite) if pulir else 0
+        fin = time.perf_counter()
+        
+        self.estadisticas = {
+            'pasos': paso_total,
+            'tiempo': fin - inicio,
+            'motivo': motivo,
+            'recalentamientos': recalentamientos,
+            'mejoras_pulido': mejoras_pulido,
+            'tiempo_pulido': fin - inicio_pulido,
+        }
         return mejor_solucion_global
 
+    def pulir(self, solucion: Solucion, fecha_limite=None):
+        """
+        Pulido posterior al recocido: lleva cada ruta a un óptimo local de 2-opt y
+        Or-opt (ver pulido.pulir_solucion), usando las listas de vecinos si las hay,
+        hasta fecha_limite (instante de time.perf_counter()) si se da.
+        Modifica la solución en su lugar y devuelve el número de mejoras.
+        """
+        return pulir_solucion(solucion, self.vecinos, LONGITUD_MAX_TRAMO, fecha_limite)
+
+    def optimizar_paralelo(self, n_cadenas=None, n_procesos=None, modo='templado',
+                           n_rondas=20, pasos_por_ronda=1000, semilla=None, pulir=True):
+        """
+        Ejecuta varias cadenas en un pool de procesos y devuelve la mejor Solucion.
+
+        modo='templado': templado paralelo, una cadena por temperatura con
+        intercambio de estados entre temperaturas vecinas tras cada ronda.
+        modo='reinicios': recocidos completos e independientes con semillas distintas.
+        Con pulir=True la mejor solución se pule al final igual que en optimizar().
+        """
+        from paralelo import ejecutar_en_paralelo
+        mejor = ejecutar_en_paralelo(self, n_cadenas, n_procesos, modo, n_rondas, pasos_por_ronda, semilla)
+        if pulir:
+            self.pulir(mejor)
+        return mejor
+
 # ==============================================================================
 # EJECUCIÓN DEL PROGRAMA PRINCIPAL Y REPORTE POR DISTRIBUIDOR
 # ==============================================================================
 
 if __name__ == "__main__":
     
-    # 1. Inicializar datos
-    datos = Datos()
+    # 1. Inicializar datos (True = matrices reales de la carpeta documentos)
+    USAR_DOCUMENTOS = False
+    datos = Datos(usar_documentos=USAR_DOCUMENTOS)
     
     # Parámetros del Recocido Simulado
     T_INICIAL = 100.0          
     T_FINAL = 0.5            
     FACTOR_ENFRIAMIENTO = 0.95 
     ITER_POR_TEMP = 200        
+    K_VECINOS = 10             # Tamaño de las listas de candidatos (None = vecindario completo)
+    LIMITE_TIEMPO = None       # Segundos (None = hasta llegar a T_FINAL)
+    IMPRESION_INTERVALO = 10   # Imprimir cada 10 niveles de temperatura
     
     # 2. Inicializar y ejecutar el optimizador
     sa = RecocidoSimulado(
@@ -179,26 +536,38 @@ if __name__ == "__main__":
         T_INICIAL, 
         T_FINAL, 
         FACTOR_ENFRIAMIENTO, 
-        ITER_POR_TEMP
+        ITER_POR_TEMP,
+        k_vecinos=K_VECINOS,
+        pesos_operadores=PESOS_OPERADORES
     )
     
-    final_solution = sa.optimizar()
+    def imprimir_progreso(progreso):
+        """Muestra solo Costo y T cada IMPRESION_INTERVALO niveles."""
+        if progreso['nivel'] == 1 or progreso['nivel'] % IMPRESION_INTERVALO == 0:
+            print(f"Paso {progreso['paso']:<6} -> Costo=${progreso['costo_actual']:,.2f} "
+                  f"| Mejor=${progreso['mejor_costo']:,.2f} | T={progreso['T']:.2f}")
+
+    print(f"--- INICIO DEL RECOCIDO SIMULADO (Factor de Enfriamiento: {FACTOR_ENFRIAMIENTO}) ---")
+    final_solution = sa.optimizar(limite_tiempo=LIMITE_TIEMPO, callback=imprimir_progreso)
+    print(f"--- FIN DEL RECOCIDO SIMULADO (Total Pasos: {sa.estadisticas['pasos']}, "
+          f"{sa.estadisticas['tiempo']:.2f} s, parada: {sa.estadisticas['motivo']}, "
+          f"mejoras del pulido: {sa.estadisticas['mejoras_pulido']}) ---")
 
     # 3. Generar Reporte Final
     print(f"\nREPORTE FINAL DE DISTRIBUCIÓN (Ruta Óptima por Gasto de Gasolina)")
     print("=======================================================================================================================")
     
     print(f" Gasto Total de Gasolina: ${final_solution.costo_base:,.2f}") 
-    print(f"Tiendas Surtidas: {len(datos.clientes)} | Distribuidores Utilizados: {len(final_solution.rutas)} / {len(datos.DEPOSITOS_DISPONIBLES)}")
+    print(f"Tiendas Surtidas: {len(datos.clientes)} | Distribuidores Utilizados: {final_solution.rutas_activas} / {len(datos.DEPOSITOS_DISPONIBLES)}")
     print("-----------------------------------------------------------------------------------------------------------------------")
     
-    rutas_ordenadas = sorted(final_solution.rutas, key=lambda r: r['deposito'])
+    rutas_ordenadas = sorted([r for r in final_solution.rutas if r.clientes], key=lambda r: r.deposito)
 
     for i, ruta_info in enumerate(rutas_ordenadas):
-        deposito = ruta_info['deposito']
-        ruta_clientes = ruta_info['clientes']
+        deposito = datos.nombre(ruta_info.deposito)
+        ruta_clientes = [datos.nombre(c) for c in ruta_info.clientes]
         
-        costo_ruta = Solucion([ruta_info], datos).costo_base
+        costo_ruta = ruta_info.costo
         
         print(f"\nDistribuidor: {deposito} (Ruta {i+1})")
         print(f"    - Costo de Gasolina: ${costo_ruta:,.2f}")
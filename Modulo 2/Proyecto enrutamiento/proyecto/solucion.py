@@ -1,62 +1,106 @@
-import copy
-from datos import Datos 
+from array import array
+import numpy as np
+from datos import Datos
 
 # Definición de la penalización por no usar 10 CDDs. Valor muy alto.
-PENALIZACION_RUTAS_INCOMPLETAS = 1_000_000_000 
+PENALIZACION_RUTAS_INCOMPLETAS = 1_000_000_000
+
+class Ruta:
+    """
+    Ruta de un CDD: índice del depósito y arreglo compacto de índices de clientes.
+
+    `carga` y `costo` se guardan en caché; los calcula Solucion al construirse
+    y los mantienen los movimientos al aplicarse.
+    """
+    __slots__ = ('deposito', 'clientes', 'carga', 'costo')
+
+    def __init__(self, deposito, clientes=()):
+        self.deposito = deposito
+        self.clientes = array('i', clientes)
+        self.carga = 0
+        self.costo = 0.0
+
+    def indices(self):
+        """Vista NumPy (sin copia) de los clientes de la ruta."""
+        return np.frombuffer(self.clientes, dtype=np.int32)
+
+    def copiar(self):
+        copia = Ruta.__new__(Ruta)
+        copia.deposito = self.deposito
+        copia.clientes = self.clientes[:]
+        copia.carga = self.carga
+        copia.costo = self.costo
+        return copia
+
 
 class Solucion:
     """
     Representa una solución de MDVRP, con penalización para forzar 10 CDDs.
     """
-    
+    __slots__ = ('rutas', 'datos', 'costo_base', 'es_valida', 'costo', 'rutas_activas', 'ruta_de')
+
     def __init__(self, rutas: list, datos: Datos):
-        self.rutas = rutas  
+        # Lista de Ruta con índices de nodo. Puede haber rutas vacías;
+        # solo cuentan como activas las que tienen clientes.
+        self.rutas = rutas
         self.datos = datos
-        self.costo_base = self._calcular_costo_base() 
+        self.costo_base = self._calcular_costo_base()
+        self.rutas_activas = len([r for r in self.rutas if r.clientes])
+        self.ruta_de = self._indexar_rutas()
         self.es_valida = self._es_solucion_valida()
-        self.costo = self._aplicar_penalizacion_rutas() 
+        self.costo = self._aplicar_penalizacion_rutas()
 
     def _calcular_costo_base(self):
-        """Calcula el costo total (gasto de gasolina) de las rutas activas."""
+        """Calcula el costo total (gasto de gasolina) y llena la carga y el costo de cada ruta."""
         costo_total = 0
-        cost_matrix = self.datos.COSTO_MATRIX 
-        
-        for ruta_info in self.rutas:
-            deposito = ruta_info['deposito']
-            clientes = ruta_info['clientes']
-            
-            if not clientes:
+        cost_matrix = self.datos.COSTO_MATRIX
+        demandas = self.datos.DEMANDAS
+
+        for ruta in self.rutas:
+            if not ruta.clientes:
+                ruta.carga = 0
+                ruta.costo = 0.0
                 continue
-            
-            ruta_completa = [deposito] + clientes + [deposito]
-            for i in range(len(ruta_completa) - 1):
-                costo_total += cost_matrix[ruta_completa[i]][ruta_completa[i+1]]
+
+            clientes = ruta.indices()
+            ruta.carga = int(demandas[clientes].sum())
+            ruta.costo = float(cost_matrix[ruta.deposito, clientes[0]]
+                               + cost_matrix[clientes[:-1], clientes[1:]].sum()
+                               + cost_matrix[clientes[-1], ruta.deposito])
+            costo_total += ruta.costo
         return costo_total
-    
+
+    def _indexar_rutas(self):
+        """Índice de ruta de cada nodo (cliente o depósito); -1 si no está asignado."""
+        ruta_de = array('i', [-1]) * len(self.datos.NODOS)
+        for r_idx, ruta in enumerate(self.rutas):
+            ruta_de[ruta.deposito] = r_idx
+            for cliente in ruta.clientes:
+                ruta_de[cliente] = r_idx
+        return ruta_de
+
     def _aplicar_penalizacion_rutas(self):
         """Aplica la penalización si no se usan exactamente 10 rutas con clientes."""
         costo = self.costo_base
-        
-        num_rutas_activas = len([r for r in self.rutas if r['clientes']])
-        
-        if num_rutas_activas != len(self.datos.DEPOSITOS_DISPONIBLES):
-            costo += PENALIZACION_RUTAS_INCOMPLETAS 
-        
+
+        if self.rutas_activas != len(self.datos.DEPOSITOS_DISPONIBLES):
+            costo += PENALIZACION_RUTAS_INCOMPLETAS
+
         return costo
 
     def _es_solucion_valida(self):
-        """Verifica la restricción de capacidad (hard constraint) para cada ruta."""
-        demandas = self.datos.DEMANDAS
+        """Verifica la restricción de capacidad (hard constraint) con la carga en caché de cada ruta."""
         capacidad = self.datos.CAPACIDAD_VEHICULO
-        
-        for ruta_info in self.rutas:
-            clientes = ruta_info['clientes']
-            demanda_ruta = sum(demandas.get(nodo, 0) for nodo in clientes)
-            
-            if demanda_ruta > capacidad:
-                return False
-        return True
+        return all(ruta.carga <= capacidad for ruta in self.rutas)
 
     def copiar(self):
-        """Devuelve una copia profunda de la solución."""
-        return Solucion(copy.deepcopy(self.rutas), self.datos)
\ No newline at end of file
+        """Devuelve una instantánea de la solución: copia los arreglos de clientes sin recalcular costos."""
+        copia = Solucion.__new__(Solucion)
+        copia.rutas = [ruta.copiar() for ruta in self.rutas]
+        copia.datos = self.datos
+        copia.costo_base = self.costo_base
+        copia.es_valida = self.es_valida
+        copia.costo = self.costo
+        copia.rutas_activas = self.rutas_activas
+        copia.ruta_de = self.ruta_de[:]
+        return copia
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los módulos del proyecto se importan de forma plana (from datos import Datos)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'proyecto'))
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from datos import Datos
+from solucion import Solucion, Ruta
+from movimientos import Reubicar, DosOpt, OrOpt, DosOptEstrella, IntercambioCruzado, LONGITUD_ESCALAR
+
+# Movimientos aleatorios por tipo
+N_MOVIMIENTOS = 300
+# Rutas activas de las soluciones aleatorias: con 9 o 10 los movimientos que vacían o
+# estrenan una ruta cruzan el límite de 10 CDD y cambian la penalización
+RUTAS_ACTIVAS = (9, 10)
+# Tramos más largos que LONGITUD_ESCALAR para probar también la suma con NumPy
+LONGITUD_MAX = LONGITUD_ESCALAR + 4
+
+
+@pytest.fixture(scope='module')
+def datos():
+    datos = Datos(rng=random.Random(0))
+    # Capacidad ajustada para que algunos movimientos no sean factibles
+    datos.CAPACIDAD_VEHICULO = int(datos.DEMANDAS.sum()) // min(RUTAS_ACTIVAS)
+    return datos
+
+
+def _solucion_aleatoria(datos, rng):
+    """Clientes repartidos al azar en 9 o 10 CDD; una ruta activa tiene un solo cliente."""
+    depositos = datos.DEPOSITOS_DISPONIBLES
+    activos = rng.sample(depositos, rng.choice(RUTAS_ACTIVAS))
+    clientes = datos.clientes[:]
+    rng.shuffle(clientes)
+    asignados = {d: [] for d in depositos}
+    asignados[activos[0]].append(clientes.pop())
+    for cliente in clientes:
+        asignados[rng.choice(activos[1:])].append(cliente)
+    return Solucion([Ruta(d, asignados[d]) for d in depositos], datos)
+
+
+def _ruta_con_clientes(sol, rng, minimo=1):
+    return rng.choice([r for r, ruta in enumerate(sol.rutas) if len(ruta.clientes) >= minimo])
+
+
+def _reubicar(sol, rng):
+    r1 = _ruta_con_clientes(sol, rng)
+    r2 = rng.randrange(len(sol.rutas))
+    largo1, largo2 = len(sol.rutas[r1].clientes), len(sol.rutas[r2].clientes)
+    i = rng.randrange(largo1)
+    j = rng.randrange(largo1) if r1 == r2 else rng.randint(0, largo2)
+    return Reubicar(sol, r1, i, r2, j)
+
+
+def _dos_opt(sol, rng):
+    r = _ruta_con_clientes(sol, rng, minimo=2)
+    i, j = sorted(rng.sample(range(len(sol.rutas[r].clientes)), 2))
+    return DosOpt(sol, r, i, j)
+
+
+def _or_opt(sol, rng):
+    r1 = _ruta_con_clientes(sol, rng)
+    r2 = rng.randrange(len(sol.rutas))
+    largo1 = len(sol.rutas[r1].clientes)
+    i = rng.randrange(largo1)
+    longitud = rng.randint(1, min(LONGITUD_MAX, largo1 - i))
+    largo_destino = largo1 - longitud if r1 == r2 else len(sol.rutas[r2].clientes)
+    return OrOpt(sol, r1, i, longitud, r2, rng.randint(0, largo_destino), invertir=rng.random() < 0.5)
+
+
+def _dos_opt_estrella(sol, rng):
+    r1, r2 = rng.sample(range(len(sol.rutas)), 2)
+    i = rng.randint(0, len(sol.rutas[r1].clientes))
+    j = rng.randint(0, len(sol.rutas[r2].clientes))
+    return DosOptEstrella(sol, r1, i, r2, j)
+
+
+def _intercambio_cruzado(sol, rng):
+    r1 = _ruta_con_clientes(sol, rng)
+    r2 = rng.choice([r for r in range(len(sol.rutas)) if r != r1])
+    largo1, largo2 = len(sol.rutas[r1].clientes), len(sol.rutas[r2].clientes)
+    i = rng.randrange(largo1)
+    j = rng.randint(0, largo2)
+    l1 = rng.randint(1, min(LONGITUD_MAX, largo1 - i))
+    l2 = rng.randint(0, min(LONGITUD_MAX, largo2 - j))
+    return IntercambioCruzado(sol, r1, i, l1, r2, j, l2)
+
+
+def _estado(sol):
+    return ([(ruta.deposito, list(ruta.clientes), ruta.carga, ruta.costo) for ruta in sol.rutas],
+            sol.costo_base, sol.costo, sol.rutas_activas, list(sol.ruta_de))
+
+
+@pytest.mark.parametrize('generar', [_reubicar, _dos_opt, _or_opt, _dos_opt_estrella, _intercambio_cruzado])
+def test_delta_aplicar_y_deshacer(datos, generar):
+    rng = random.Random(generar.__name__)
+    for _ in range(N_MOVIMIENTOS):
+        sol = _solucion_aleatoria(datos, rng)
+        rutas_antes, costo_base_antes, costo_antes, activas_antes, ruta_de_antes = _estado(sol)
+        movimiento = generar(sol, rng)
+
+        # Factibilidad: sin sobrecarga de partida, coincide con la capacidad tras aplicar
+        valida_antes = sol.es_valida
+        movimiento.aplicar()
+        referencia = Solucion([Ruta(ruta.deposito, ruta.clientes) for ruta in sol.rutas], datos)
+
+        assert costo_antes + movimiento.delta == pytest.approx(referencia.costo, abs=1e-6)
+        assert sol.costo == pytest.approx(referencia.costo, abs=1e-6)
+        assert sol.costo_base == pytest.approx(referencia.costo_base, abs=1e-6)
+        assert sol.rutas_activas == referencia.rutas_activas
+        assert list(sol.ruta_de) == list(referencia.ruta_de)
+        for ruta, esperada in zip(sol.rutas, referencia.rutas):
+            assert ruta.carga == esperada.carga
+            assert ruta.costo == pytest.approx(esperada.costo, abs=1e-6)
+        if valida_antes:
+            assert movimiento.factible == referencia.es_valida
+
+        movimiento.deshacer()
+        rutas, costo_base, costo, activas, ruta_de = _estado(sol)
+        assert [r[:3] for r in rutas] == [r[:3] for r in rutas_antes]
+        assert [r[3] for r in rutas] == pytest.approx([r[3] for r in rutas_antes], abs=1e-6)
+        assert costo_base == pytest.approx(costo_base_antes, abs=1e-6)
+        assert costo == pytest.approx(costo_antes, abs=1e-6)
+        assert activas == activas_antes
+        assert ruta_de == ruta_de_antes
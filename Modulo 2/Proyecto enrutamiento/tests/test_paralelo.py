@@ -0,0 +1,25 @@
+import multiprocessing
+
+import pytest
+
+from datos import Datos
+from recocido import RecocidoSimulado
+import paralelo
+
+
+@pytest.mark.parametrize('costos', ['matriz', 'bajo_demanda'])
+def test_trabajadores_con_spawn(costos):
+    # Datos() sin rng, como en los bloques __main__; con spawn los initargs se serializan
+    datos = Datos(costos=costos)
+    parametros = RecocidoSimulado(datos, 100, 1, 0.9, 10)._parametros()
+    memorias, init_args = paralelo.compartir_matriz(datos)
+    try:
+        contexto = multiprocessing.get_context('spawn')
+        with contexto.Pool(1, initializer=paralelo._inicializar_trabajador, initargs=init_args) as pool:
+            rutas, costo, _, _ = pool.apply(paralelo._ejecutar_cadena, ((parametros, None, 10.0, 50, 0),))
+    finally:
+        paralelo.liberar_matriz(memorias)
+
+    solucion = paralelo.importar_rutas(rutas, datos)
+    assert sorted(c for ruta in solucion.rutas for c in ruta.clientes) == sorted(datos.clientes)
+    assert solucion.costo == pytest.approx(costo)
@@ -0,0 +1,43 @@
+import random
+
+from datos import Datos
+from solucion import Solucion, Ruta
+from recocido import RecocidoSimulado
+
+
+def _instancia(holgura):
+    """Datos por omisión con la capacidad ajustada a demanda_total / 10 + holgura."""
+    datos = Datos(rng=random.Random(0))
+    demanda_total = int(datos.DEMANDAS[datos.clientes].sum())
+    datos.CAPACIDAD_VEHICULO = demanda_total // len(datos.DEPOSITOS_DISPONIBLES) + holgura
+    return datos
+
+
+def _todos_en_una_ruta(datos):
+    """Solución sobrecargada: todos los clientes en el primer CDD y las demás rutas vacías."""
+    depositos = datos.DEPOSITOS_DISPONIBLES
+    rutas = [Ruta(depositos[0], datos.clientes)] + [Ruta(d) for d in depositos[1:]]
+    return Solucion(rutas, datos)
+
+
+def _clientes(solucion):
+    return sorted(c for ruta in solucion.rutas for c in ruta.clientes)
+
+
+def test_reparar_capacidad_no_pierde_clientes_con_demanda_ajustada():
+    # La capacidad total no alcanza para toda la demanda: no hay reparación factible
+    datos = _instancia(holgura=-5)
+    sa = RecocidoSimulado(datos, 100, 1, 0.9, 10, rng=random.Random(0))
+    reparada = sa._reparar_capacidad(_todos_en_una_ruta(datos))
+
+    assert _clientes(reparada) == sorted(datos.clientes)
+    assert not reparada.es_valida
+
+
+def test_reparar_capacidad_factible_conserva_clientes():
+    datos = _instancia(holgura=60)
+    sa = RecocidoSimulado(datos, 100, 1, 0.9, 10, rng=random.Random(0))
+    reparada = sa._reparar_capacidad(_todos_en_una_ruta(datos))
+
+    assert _clientes(reparada) == sorted(datos.clientes)
+    assert reparada.es_valida
@@ -0,0 +1,128 @@
+# barrido.py
+
+import contextlib
+import io
+import itertools
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from procesador_datos import ProcesadorDatos, RESOLUCION_RASTER
+from optimizador_pso import OptimizadorPSO
+from memoria_compartida import compartir_procesador, conectar_procesador, liberar_memorias
+
+FACTORES = ('F_cultivo', 'F_suelo', 'F_cobertura')
+
+# Estado de cada proceso trabajador (se llena en _inicializar_trabajador)
+_PROCESADOR = None
+_MEMORIAS = []
+
+
+def rejilla_pesos(paso=0.25):
+    """Vectores (w_cultivo, w_suelo, w_cobertura) con componentes múltiplos de `paso` que suman 1."""
+    n = int(round(1 / paso))
+    return [(i / n, j / n, (n - i - j) / n) for i in range(n + 1) for j in range(n + 1 - i)]
+
+
+def _inicializar_trabajador(procesador, descriptores):
+    """Conecta el proceso trabajador a los arreglos compartidos (sin copiarlos)."""
+    global _PROCESADOR, _MEMORIAS
+    _MEMORIAS = conectar_procesador(procesador, descriptores)
+    _PROCESADOR = procesador
+
+
+def _ejecutar_configuracion(args):
+    """Corre el PSO para una configuración (n_sensores, pesos) y devuelve su fila de resultados."""
+    n_sensores, pesos, semilla, busqueda, resolucion_raster, opciones = args
+    inicio = time.perf_counter()
+    optimizador = OptimizadorPSO(_PROCESADOR, n_sensores, *pesos, busqueda=busqueda,
+                                 resolucion_raster=resolucion_raster)
+    # Los mensajes de cada corrida se silencian; el progreso lo reporta barrido()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizador.ejecutar_optimizacion(semilla=semilla, **opciones)
+    factores = optimizador.calcular_factores(optimizador.gbest_coords.reshape(1, -1))
+
+    return {
+        'n_sensores': n_sensores,
+        'w_cultivo': pesos[0],
+        'w_suelo': pesos[1],
+        'w_cobertura': pesos[2],
+        'aptitud': -float(optimizador.gbest_cost),
+        **{nombre: float(valor[0]) for nombre, valor in zip(FACTORES, factores)},
+        'gbest_coords': optimizador.gbest_coords.tolist(),
+        'iteraciones': optimizador.iteraciones_realizadas,
+        'tiempo': time.perf_counter() - inicio,
+    }
+
+
+def frente_pareto(resultados: pd.DataFrame):
+    """
+    Máscara de las filas no dominadas: ninguna otra usa los mismos o menos
+    sensores con todos los factores iguales o mayores y al menos una cosa mejor.
+    """
+    # Todo se pasa a "mayor es mejor"
+    objetivos = np.column_stack([-resultados['n_sensores'].to_numpy(dtype=np.float64),
+                                 resultados[list(FACTORES)].to_numpy(dtype=np.float64)])
+    mayor_igual = (objetivos[:, np.newaxis, :] >= objetivos[np.newaxis, :, :]).all(axis=2)
+    mayor = (objetivos[:, np.newaxis, :] > objetivos[np.newaxis, :, :]).any(axis=2)
+    # dominada[j]: existe i con i >= j en todo y i > j en algo
+    dominada = (mayor_igual & mayor).any(axis=0)
+    return ~dominada
+
+
+def barrido(procesador: ProcesadorDatos, n_sensores=(4, 6, 8), pesos=None, n_procesos=None, semilla=None,
+            busqueda='kdtree', resolucion_raster=RESOLUCION_RASTER, **opciones_optimizacion):
+    """
+    Explora la rejilla n_sensores x pesos (por defecto rejilla_pesos()) con un pool
+    de procesos. El campo se preprocesa una sola vez (el procesador recibido) y
+    sus arreglos se comparten con los trabajadores en memoria compartida.
+    opciones_optimizacion se pasan a OptimizadorPSO.ejecutar_optimizacion
+    (n_particulas, iteraciones, criterios de parada, ...).
+
+    Devuelve un DataFrame con una fila por configuración: pesos, aptitud, los
+    factores sin ponderar (F_cultivo, F_suelo, F_cobertura), gbest_coords y la
+    columna 'pareto', que marca el conjunto no dominado (ver frente_pareto).
+    """
+    pesos = rejilla_pesos() if pesos is None else pesos
+    configuraciones = list(itertools.product(n_sensores, pesos))
+    semillas = np.random.default_rng(semilla).integers(2**32, size=len(configuraciones))
+    tareas = [(n, tuple(w), int(s), busqueda, resolucion_raster, opciones_optimizacion)
+              for (n, w), s in zip(configuraciones, semillas)]
+
+    # Con raster, se construye aquí una vez (los límites no dependen del número de sensores)
+    if busqueda == 'raster':
+        OptimizadorPSO(procesador, 1, 1, 0, 0, busqueda=busqueda, resolucion_raster=resolucion_raster)
+
+    print(f"\n--- Barrido: {len(tareas)} configuraciones ({len(n_sensores)} números de sensores x "
+          f"{len(pesos)} vectores de pesos) ---")
+    filas = []
+    memorias, procesador_ligero, descriptores = compartir_procesador(procesador)
+    try:
+        with Pool(n_procesos or os.cpu_count(), initializer=_inicializar_trabajador,
+                  initargs=(procesador_ligero, descriptores)) as pool:
+            for fila in pool.imap(_ejecutar_configuracion, tareas):
+                filas.append(fila)
+                print(f"  {len(filas)}/{len(tareas)}: {fila['n_sensores']} sensores, pesos "
+                      f"({fila['w_cultivo']:.2f}, {fila['w_suelo']:.2f}, {fila['w_cobertura']:.2f}) "
+                      f"-> aptitud {fila['aptitud']:.4f}")
+    finally:
+        liberar_memorias(memorias)
+    print("--- Barrido Finalizado ---")
+
+    resultados = pd.DataFrame(filas)
+    resultados['pareto'] = frente_pareto(resultados)
+    return resultados
+
+
+if __name__ == "__main__":
+    from datos_entrada import datos_entrada_str
+
+    procesador = ProcesadorDatos(datos_entrada_str)
+    resultados = barrido(procesador, n_sensores=(4, 6, 8), pesos=rejilla_pesos(0.25),
+                         semilla=0, n_particulas=60, iteraciones=150, ventana_estancamiento=30)
+
+    print("\n--- Conjunto No Dominado ---")
+    columnas = ['n_sensores', 'w_cultivo', 'w_suelo', 'w_cobertura', 'aptitud', *FACTORES]
+    print(resultados.loc[resultados['pareto'], columnas].to_string(index=False, float_format="{:.4f}".format))
@@ -0,0 +1,231 @@
+# benchmark.py
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from procesador_datos import ProcesadorDatos, METODOS_BUSQUEDA
+from optimizador_pso import OptimizadorPSO
+
+# Puntos de referencia de los campos sintéticos
+TAMANOS = (100, 1_000, 10_000, 100_000, 1_000_000)
+# Partículas y sensores de la rejilla de evaluaciones
+PARTICULAS = (30, 60, 120)
+SENSORES = (3, 6, 12)
+# Configuración de las corridas completas
+PARTICULAS_CORRIDA = 60
+SENSORES_CORRIDA = 6
+ITERACIONES_CORRIDA = 50
+# La fuerza bruta es O(consultas x puntos): por encima de este tamaño solo se usa para la concordancia
+MAX_PUNTOS_FUERZA_BRUTA = 100_000
+# Cada medición de evaluaciones repite la llamada hasta acumular este tiempo
+TIEMPO_MINIMO = 0.2
+
+# Zona de Guasave de los datos de entrada (los límites de latitud del PSO son fijos)
+LATITUD = (25.52, 25.62)
+LONGITUD = (-108.52, -108.42)
+# Diferencia de distancia al punto más cercano permitida entre los motores exactos
+TOLERANCIA_CONCORDANCIA = 1e-9
+# Margen permitido antes de reportar una regresión contra la línea base
+TOLERANCIA_REGRESION = 0.2
+
+
+def generar_campo(n_puntos, semilla):
+    """Campo sintético reproducible: puntos uniformes en la zona, cultivo, elevación y salinidad al azar."""
+    rng = np.random.default_rng(semilla)
+    puntos = np.column_stack([rng.uniform(*LATITUD, n_puntos), rng.uniform(*LONGITUD, n_puntos)])
+    return ProcesadorDatos.desde_arreglos(
+        puntos,
+        rng.integers(0, 3, n_puntos),
+        rng.uniform(10, 50, n_puntos),
+        rng.uniform(0.5, 8, n_puntos),
+    )
+
+
+def _swarm(optimizador, n_particulas, semilla):
+    """Posiciones uniformes dentro de los límites de búsqueda."""
+    return np.random.default_rng(semilla).uniform(*optimizador.limites, size=(n_particulas, optimizador.D))
+
+
+def medir_evaluaciones(optimizador, n_particulas, semilla=0):
+    """Evaluaciones de aptitud (partículas) por segundo de funcion_aptitud sobre un enjambre aleatorio."""
+    X = _swarm(optimizador, n_particulas, semilla)
+    llamadas = 0
+    inicio = time.perf_counter()
+    while True:
+        optimizador.funcion_aptitud(X)
+        llamadas += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= TIEMPO_MINIMO:
+            return llamadas * n_particulas / transcurrido
+
+
+def medir_corrida(optimizador, semilla=0):
+    """Tiempo de reloj y costo final de una corrida completa (ITERACIONES_CORRIDA, sin parada anticipada)."""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizador.ejecutar_optimizacion(PARTICULAS_CORRIDA, ITERACIONES_CORRIDA, semilla=semilla)
+    return time.perf_counter() - inicio, float(optimizador.gbest_cost)
+
+
+def medir_concordancia(procesador, semilla=0):
+    """
+    Compara los motores sobre los sensores de un mismo enjambre. kdtree y fuerza
+    bruta son exactos: deben dar la misma distancia al punto más cercano (hasta
+    TOLERANCIA_CONCORDANCIA), aunque en empates (p. ej. puntos repetidos al
+    redondear a float32) elijan índices distintos, que se cuentan aparte. El
+    raster es aproximado: se reporta su diferencia máxima de costo y su
+    discrepancia de índices.
+    """
+    # Con busqueda='raster' se construye el raster si aún no existe
+    optimizador = OptimizadorPSO(procesador, SENSORES_CORRIDA, 0.2, 0.2, 0.6, busqueda='raster')
+    X = _swarm(optimizador, PARTICULAS_CORRIDA, semilla)
+    sensores = X.reshape(-1, 2)
+    puntos = procesador.PUNTOS_REF
+
+    indices_arbol = procesador.indices_mas_cercanos(sensores, 'kdtree')
+    indices_fuerza = procesador.indices_mas_cercanos(sensores, 'fuerza_bruta')
+    diferencia = float(np.abs(np.linalg.norm(sensores - puntos[indices_arbol], axis=1)
+                              - np.linalg.norm(sensores - puntos[indices_fuerza], axis=1)).max())
+
+    costo_raster = optimizador.funcion_aptitud(X)
+    optimizador.busqueda = 'kdtree'
+    costo_arbol = optimizador.funcion_aptitud(X)
+    return {
+        'diferencia_fuerza_bruta': diferencia,
+        'coinciden': diferencia <= TOLERANCIA_CONCORDANCIA,
+        'empates': int((indices_arbol != indices_fuerza).sum()),
+        'diferencia_raster': float(np.abs(costo_arbol - costo_raster).max()),
+        'discrepancia_raster': procesador.error_raster['discrepancia'],
+    }
+
+
+def medir_campo(n_puntos, semilla=0):
+    """Genera un campo y mide construcción de los índices, concordancia, evaluaciones y corridas."""
+    inicio = time.perf_counter()
+    procesador = generar_campo(n_puntos, semilla)
+    tiempo_generacion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    procesador.indices_mas_cercanos(procesador.PUNTOS_REF[:1])
+    tiempo_arbol = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    OptimizadorPSO(procesador, 1, 1, 0, 0, busqueda='raster')
+    tiempo_raster = time.perf_counter() - inicio
+
+    campo = {
+        'n_puntos': n_puntos,
+        'tiempo_generacion': tiempo_generacion,
+        'tiempo_arbol': tiempo_arbol,
+        'tiempo_raster': tiempo_raster,
+        **medir_concordancia(procesador, semilla),
+    }
+
+    evaluaciones, corridas = [], []
+    for motor in METODOS_BUSQUEDA:
+        if motor == 'fuerza_bruta' and n_puntos > MAX_PUNTOS_FUERZA_BRUTA:
+            continue
+        for n_sensores in SENSORES:
+            optimizador = OptimizadorPSO(procesador, n_sensores, 0.2, 0.2, 0.6, busqueda=motor)
+            for n_particulas in PARTICULAS:
+                evaluaciones.append({
+                    'n_puntos': n_puntos, 'motor': motor, 'sensores': n_sensores, 'particulas': n_particulas,
+                    'evaluaciones_por_segundo': medir_evaluaciones(optimizador, n_particulas, semilla),
+                })
+            if n_sensores == SENSORES_CORRIDA:
+                tiempo, costo = medir_corrida(optimizador, semilla)
+                corridas.append({'n_puntos': n_puntos, 'motor': motor, 'tiempo': tiempo, 'costo_final': costo})
+    return campo, evaluaciones, corridas
+
+
+def _commit_actual():
+    """Hash corto del commit actual (None fuera de un repositorio git)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar_benchmark(tamanos=TAMANOS, semilla=0, archivo_salida=None):
+    """Mide todos los campos; opcionalmente guarda los resultados en JSON (con el commit y la fecha)."""
+    resultados = {'commit': _commit_actual(), 'fecha': time.strftime('%Y-%m-%d %H:%M:%S'), 'semilla': semilla,
+                  'campos': [], 'evaluaciones': [], 'corridas': []}
+    for n_puntos in tamanos:
+        campo, evaluaciones, corridas = medir_campo(n_puntos, semilla)
+        resultados['campos'].append(campo)
+        resultados['evaluaciones'].extend(evaluaciones)
+        resultados['corridas'].extend(corridas)
+        imprimir_campo(campo, evaluaciones, corridas)
+    if archivo_salida is not None:
+        with open(archivo_salida, "w") as f:
+            json.dump(resultados, f, indent=2)
+    return resultados
+
+
+def comparar_con_base(resultados, resultados_base, tolerancia=TOLERANCIA_REGRESION):
+    """
+    Compara contra una corrida anterior (misma semilla) y devuelve la lista de
+    regresiones: menos evaluaciones/s o corridas más lentas que la base por
+    encima de la tolerancia, o motores exactos que dejaron de coincidir.
+    """
+    regresiones = []
+    base = {(r['n_puntos'], r['motor'], r['sensores'], r['particulas']): r for r in resultados_base['evaluaciones']}
+    for r in resultados['evaluaciones']:
+        b = base.get((r['n_puntos'], r['motor'], r['sensores'], r['particulas']))
+        if b is not None and r['evaluaciones_por_segundo'] < b['evaluaciones_por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{r['n_puntos']} puntos, {r['motor']}, {r['sensores']} sensores, "
+                               f"{r['particulas']} partículas: {r['evaluaciones_por_segundo']:,.0f} eval/s "
+                               f"(base {b['evaluaciones_por_segundo']:,.0f})")
+
+    base = {(r['n_puntos'], r['motor']): r for r in resultados_base['corridas']}
+    for r in resultados['corridas']:
+        b = base.get((r['n_puntos'], r['motor']))
+        if b is not None and r['tiempo'] > b['tiempo'] * (1 + tolerancia):
+            regresiones.append(f"{r['n_puntos']} puntos, {r['motor']}: corrida {r['tiempo']:.2f} s "
+                               f"(base {b['tiempo']:.2f} s)")
+
+    for campo in resultados['campos']:
+        if not campo['coinciden']:
+            regresiones.append(f"{campo['n_puntos']} puntos: kdtree y fuerza bruta difieren en "
+                               f"{campo['diferencia_fuerza_bruta']:.2e}")
+    return regresiones
+
+
+def imprimir_campo(campo, evaluaciones, corridas):
+    print(f"{campo['n_puntos']:>9,} puntos | árbol {campo['tiempo_arbol']:6.2f} s | raster {campo['tiempo_raster']:6.2f} s "
+          f"| concordancia {'sí' if campo['coinciden'] else 'NO'} ({campo['empates']} empates; raster: dif. {campo['diferencia_raster']:.4f}, "
+          f"discrepancia {campo['discrepancia_raster']:.2%})")
+    for corrida in corridas:
+        por_defecto = next(e for e in evaluaciones if e['motor'] == corrida['motor']
+                           and e['sensores'] == SENSORES_CORRIDA and e['particulas'] == PARTICULAS_CORRIDA)
+        print(f"{'':>16}{corrida['motor']:>13} | {por_defecto['evaluaciones_por_segundo']:>12,.0f} eval/s "
+              f"({SENSORES_CORRIDA} sensores, {PARTICULAS_CORRIDA} partículas) "
+              f"| corrida {corrida['tiempo']:6.2f} s | costo {corrida['costo_final']:.4f}")
+
+
+if __name__ == "__main__":
+
+    SEMILLA = 0
+    ARCHIVO_RESULTADOS = "benchmark.json"
+    ARCHIVO_BASE = None        # p. ej. "benchmark_base.json" de un commit anterior
+
+    print(f"--- BENCHMARK DE LA FUNCIÓN DE APTITUD (semilla {SEMILLA}, corridas de "
+          f"{ITERACIONES_CORRIDA} iteraciones) ---")
+    resultados = ejecutar_benchmark(TAMANOS, SEMILLA, ARCHIVO_RESULTADOS)
+
+    regresiones = [f"{c['n_puntos']} puntos: kdtree y fuerza bruta no coinciden"
+                   for c in resultados['campos'] if not c['coinciden']]
+    if ARCHIVO_BASE is not None:
+        with open(ARCHIVO_BASE) as f:
+            regresiones = comparar_con_base(resultados, json.load(f))
+    for mensaje in regresiones:
+        print(f"REGRESIÓN: {mensaje}")
+    if regresiones:
+        sys.exit(1)
+    print("Sin regresiones." if ARCHIVO_BASE is not None else "Los motores exactos coinciden.")
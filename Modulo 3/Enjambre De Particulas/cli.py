@@ -0,0 +1,137 @@
+# cli.py
+"""
+Colocación de sensores sin interfaz gráfica, para trabajos por lotes:
+
+    python cli.py campo.csv --sensores 6 --pesos 0.2 0.2 0.6 --salida resultado.json
+    python cli.py campo.parquet --salida resultado.csv --plot mapa.png
+
+Solo la biblioteca estándar se importa al cargar el módulo; NumPy, pandas,
+PySwarms y SciPy se importan después de leer los argumentos (así --help es
+inmediato), y matplotlib únicamente con --plot.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+_INICIO = time.perf_counter()
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Colocación óptima de sensores con PSO (sin interfaz gráfica).")
+    parser.add_argument('archivo', help="datos del campo en CSV o Parquet (ver ProcesadorDatos.desde_archivo)")
+    parser.add_argument('--sensores', type=int, default=6, help="número de sensores (6)")
+    parser.add_argument('--pesos', type=float, nargs=3, default=(0.2, 0.2, 0.6),
+                        metavar=('W_CULTIVO', 'W_SUELO', 'W_COBERTURA'), help="pesos de la aptitud (0.2 0.2 0.6)")
+    parser.add_argument('--particulas', type=int, default=60, help="partículas del enjambre (60)")
+    parser.add_argument('--iteraciones', type=int, default=150, help="máximo de iteraciones (150)")
+    parser.add_argument('--coeficientes', type=float, nargs=3, default=(0.7, 0.9, 0.75),
+                        metavar=('C1', 'C2', 'W'), help="coeficientes del PSO (0.7 0.9 0.75)")
+    parser.add_argument('--busqueda', default='kdtree', choices=('kdtree', 'fuerza_bruta', 'raster'),
+                        help="búsqueda del punto de referencia más cercano (kdtree)")
+    parser.add_argument('--ventana', type=int, default=None,
+                        help="detener si el costo no mejora en esta cantidad de iteraciones")
+    parser.add_argument('--tiempo-max', type=float, default=None, help="presupuesto de tiempo en segundos")
+    parser.add_argument('--semilla', type=int, default=None, help="semilla de NumPy (corridas reproducibles)")
+    parser.add_argument('--sin-cache', action='store_true', help="no leer ni escribir la caché de arreglos")
+    parser.add_argument('--salida', default=None,
+                        help="archivo de resultados .json o .csv (por omisión, JSON a la salida estándar)")
+    parser.add_argument('--plot', nargs='?', const='', default=None, metavar='IMAGEN',
+                        help="graficar el mapa; con IMAGEN se guarda en ese archivo en lugar de mostrarse")
+    parser.add_argument('--silencioso', action='store_true', help="no imprimir el progreso de la optimización")
+    return parser
+
+
+def ejecutar(args):
+    """Carga el campo, corre el PSO y devuelve (procesador, optimizador, resultado)."""
+    inicio_importacion = time.perf_counter()
+    from procesador_datos import ProcesadorDatos
+    from optimizador_pso import OptimizadorPSO
+    tiempos = {'importacion': time.perf_counter() - inicio_importacion}
+
+    inicio = time.perf_counter()
+    procesador = ProcesadorDatos.desde_archivo(args.archivo, usar_cache=not args.sin_cache)
+    optimizador = OptimizadorPSO(procesador, args.sensores, *args.pesos, busqueda=args.busqueda)
+    tiempos['carga'] = time.perf_counter() - inicio
+    # Desde que arrancó el script hasta que empieza la optimización
+    tiempos['arranque'] = time.perf_counter() - _INICIO
+
+    c1, c2, w = args.coeficientes
+    inicio = time.perf_counter()
+    # El progreso va a stderr para que stdout quede solo con el resultado
+    with contextlib.redirect_stdout(io.StringIO() if args.silencioso else sys.stderr):
+        optimizador.ejecutar_optimizacion(args.particulas, args.iteraciones, c1, c2, w,
+                                          ventana_estancamiento=args.ventana, tiempo_max=args.tiempo_max,
+                                          semilla=args.semilla)
+    tiempos['optimizacion'] = time.perf_counter() - inicio
+
+    F_cultivo, F_suelo, F_cobertura = optimizador.calcular_factores(optimizador.gbest_coords.reshape(1, -1))
+    resultado = {
+        'archivo': str(args.archivo),
+        'n_sensores': args.sensores,
+        'pesos': {'w_cultivo': args.pesos[0], 'w_suelo': args.pesos[1], 'w_cobertura': args.pesos[2]},
+        'aptitud': -float(optimizador.gbest_cost),
+        'factores': {'F_cultivo': float(F_cultivo[0]), 'F_suelo': float(F_suelo[0]),
+                     'F_cobertura': float(F_cobertura[0])},
+        'gbest_coords': optimizador.gbest_coords.tolist(),
+        'historial_costo': [float(c) for c in optimizador.historial_costo],
+        'iteraciones': optimizador.iteraciones_realizadas,
+        'motivo_parada': optimizador.motivo_parada,
+        'puntos_referencia': len(procesador.PUNTOS_REF),
+        'filas_descartadas': procesador.filas_descartadas,
+        'tiempos': tiempos,
+    }
+    return procesador, optimizador, resultado
+
+
+def escribir_resultado(resultado, salida):
+    """
+    JSON: el resultado completo. CSV: una fila por sensor (coordenadas, aptitud y
+    factores) y el historial de costo en <nombre>_historial.csv.
+    """
+    if salida is None:
+        json.dump(resultado, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+
+    salida = Path(salida)
+    if salida.suffix.lower() == '.csv':
+        with open(salida, 'w', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['sensor', 'latitud', 'longitud', 'aptitud', *resultado['factores']])
+            for k, (lat, lon) in enumerate(resultado['gbest_coords'], start=1):
+                escritor.writerow([k, lat, lon, resultado['aptitud'], *resultado['factores'].values()])
+        with open(salida.with_name(f"{salida.stem}_historial.csv"), 'w', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['iteracion', 'costo'])
+            escritor.writerows(enumerate(resultado['historial_costo'], start=1))
+    else:
+        with open(salida, 'w') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    procesador, optimizador, resultado = ejecutar(args)
+    escribir_resultado(resultado, args.salida)
+
+    if args.plot is not None:
+        if args.plot:
+            # Guardar en archivo no necesita pantalla
+            import matplotlib
+            matplotlib.use('Agg')
+        from graficas import graficar_mapa
+        graficar_mapa(procesador, optimizador, archivo=args.plot or None)
+
+    tiempos = resultado['tiempos']
+    print(f"Arranque {tiempos['arranque']:.2f} s (importación {tiempos['importacion']:.2f} s, "
+          f"carga {tiempos['carga']:.2f} s) | optimización {tiempos['optimizacion']:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
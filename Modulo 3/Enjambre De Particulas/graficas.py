@@ -0,0 +1,58 @@
+# graficas.py
+
+import matplotlib.pyplot as plt
+import numpy as np
+from procesador_datos import ProcesadorDatos
+from optimizador_pso import OptimizadorPSO
+
+MAPA_COLOR_CULTIVO = {'Maíz': 'red', 'Chile': 'blue', 'Tomate': 'green'}
+
+
+def graficar_mapa(procesador: ProcesadorDatos, optimizador: OptimizadorPSO, archivo=None):
+    """
+    Mapa geoespacial de los puntos de referencia (por cultivo) y de la colocación
+    óptima de los sensores. Usa los arreglos de ProcesadorDatos (no el DataFrame),
+    así que funciona también con ProcesadorDatos.desde_archivo. Con `archivo`
+    guarda la figura en lugar de mostrarla.
+    """
+    coords_sensores = optimizador.gbest_coords
+    n_sensores = len(coords_sensores)
+
+    # Tamaño de grafica
+    plt.figure(figsize=(10, 7))
+
+    # Puntos de referencia (Cultivos)
+    colores = np.array([MAPA_COLOR_CULTIVO.get(c, 'black') for c in procesador.NOMBRES_CULTIVO])
+    plt.scatter(procesador.PUNTOS_REF[:, 1], procesador.PUNTOS_REF[:, 0],
+                c=colores[procesador.REF_CODIGO_CULTIVO],
+                label='Puntos de Referencia', alpha=0.6)
+
+    # Posiciones óptimas de los sensores
+    plt.scatter(coords_sensores[:, 1], coords_sensores[:, 0],
+                marker='*', s=300, color='gold', edgecolor='black', zorder=5,
+                label=f'Ubicación Óptima de {n_sensores} Sensores (PSO)')
+
+    # Conectar cada sensor a su punto de referencia más cercano
+    indices_ref_mas_cercano_final = procesador.indices_mas_cercanos(coords_sensores)
+
+    for k in range(n_sensores):
+        ref_lat, ref_lon = procesador.PUNTOS_REF[indices_ref_mas_cercano_final[k]]
+        plt.plot([coords_sensores[k, 1], ref_lon], [coords_sensores[k, 0], ref_lat], 'k--', alpha=0.3)
+
+    plt.title("Mapa Geoespacial de Cultivos y Colocación Óptima de Sensores (Guasave)")
+    plt.xlabel("Longitud")
+    plt.ylabel("Latitud")
+
+    leyenda_cultivos = [plt.Line2D([0], [0], marker='o', color='w', label=c,
+                                  markerfacecolor=MAPA_COLOR_CULTIVO[c], markersize=10)
+                       for c in ['Maíz', 'Chile', 'Tomate']]
+    leyenda_sensores = [plt.Line2D([0], [0], marker='*', color='w', label='Sensor Óptimo',
+                                   markerfacecolor='gold', markeredgecolor='black', markersize=15)]
+    plt.legend(handles=leyenda_cultivos + leyenda_sensores, title='Cultivo', loc='lower right')
+    plt.grid(True)
+
+    if archivo:
+        plt.savefig(archivo, dpi=150, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
@@ -0,0 +1,124 @@
+# islas.py
+
+import copy
+import os
+from multiprocessing import Pool
+
+import numpy as np
+from memoria_compartida import compartir_procesador, conectar_procesador, liberar_memorias
+
+# Variación de c1, c2 y w entre islas (fracción alrededor de los valores base)
+VARIACION_COEFICIENTES = 0.25
+
+# Estado de cada proceso trabajador (se llena en _inicializar_trabajador)
+_OPTIMIZADOR = None
+_MEMORIAS = []
+
+
+def _inicializar_trabajador(optimizador, descriptores):
+    """Conecta el proceso trabajador a los arreglos compartidos (sin copiarlos)."""
+    global _OPTIMIZADOR, _MEMORIAS
+    _MEMORIAS = conectar_procesador(optimizador.dp, descriptores)
+    _OPTIMIZADOR = optimizador
+
+
+def _ejecutar_isla(args):
+    """Avanza una isla `iteraciones` iteraciones desde su estado (o desde cero si es None)."""
+    opciones, n_particulas, estado, iteraciones, semilla = args
+    # PySwarms usa el generador global de NumPy; los reinicios, el del optimizador
+    np.random.seed(semilla)
+    _OPTIMIZADOR.rng = np.random.default_rng(semilla)
+
+    if estado is None:
+        optimizador = _OPTIMIZADOR._crear_enjambre(n_particulas, opciones)
+    else:
+        optimizador = _OPTIMIZADOR._crear_enjambre(n_particulas, opciones, init_pos=estado['position'])
+        swarm = optimizador.swarm
+        swarm.velocity = estado['velocity']
+        swarm.pbest_pos = estado['pbest_pos']
+        swarm.pbest_cost = estado['pbest_cost']
+        swarm.best_pos = estado['best_pos']
+        swarm.best_cost = estado['best_cost']
+
+    _OPTIMIZADOR._iterar(optimizador, iteraciones)
+
+    swarm = optimizador.swarm
+    return {
+        'position': swarm.position,
+        'velocity': swarm.velocity,
+        'pbest_pos': swarm.pbest_pos,
+        'pbest_cost': swarm.pbest_cost,
+        'best_pos': swarm.best_pos,
+        'best_cost': swarm.best_cost,
+    }, optimizador.cost_history
+
+
+def _opciones_islas(n_islas, base, rng):
+    """La isla 0 usa los coeficientes base; las demás, valores sorteados alrededor de ellos."""
+    opciones = [dict(base)]
+    for _ in range(n_islas - 1):
+        opciones.append({clave: valor * rng.uniform(1 - VARIACION_COEFICIENTES, 1 + VARIACION_COEFICIENTES)
+                         for clave, valor in base.items()})
+    return opciones
+
+
+def _migrar(estados, n_migrantes):
+    """Anillo: las mejores partículas de la isla k reemplazan a las peores de la isla k + 1."""
+    migrantes = []
+    for estado in estados:
+        mejores = np.argsort(estado['pbest_cost'])[:n_migrantes]
+        migrantes.append((estado['pbest_pos'][mejores].copy(), estado['pbest_cost'][mejores].copy()))
+
+    for k, estado in enumerate(estados):
+        posiciones, costos = migrantes[k - 1]
+        peores = np.argsort(estado['pbest_cost'])[-n_migrantes:]
+        estado['position'][peores] = posiciones
+        estado['pbest_pos'][peores] = posiciones
+        estado['pbest_cost'][peores] = costos
+
+
+def ejecutar_islas(optimizador, n_islas=None, n_procesos=None, n_particulas=60, iteraciones=150,
+                   iteraciones_migracion=10, n_migrantes=2, opciones=None, semilla=None):
+    """Ver OptimizadorPSO.ejecutar_islas."""
+    n_procesos = n_procesos or os.cpu_count()
+    n_islas = n_islas or n_procesos
+    if n_migrantes >= n_particulas:
+        raise ValueError("n_migrantes debe ser menor que n_particulas")
+    rng = np.random.default_rng(semilla)
+    opciones_islas = _opciones_islas(n_islas, opciones or {'c1': 0.7, 'c2': 0.9, 'w': 0.75}, rng)
+
+    estados = [None] * n_islas
+    historiales = [[] for _ in range(n_islas)]
+
+    print(f"\n--- Iniciando PSO por Islas: {n_islas} enjambres de {n_particulas} partículas, "
+          f"migración cada {iteraciones_migracion} iteraciones ---")
+    # Copia ligera del optimizador (sin el enjambre anterior) con el procesador sin arreglos
+    memorias, procesador_ligero, descriptores = compartir_procesador(optimizador.dp)
+    ligero = copy.copy(optimizador)
+    ligero.dp = procesador_ligero
+    ligero.__dict__.pop('optimizador', None)
+    try:
+        with Pool(n_procesos, initializer=_inicializar_trabajador, initargs=(ligero, descriptores)) as pool:
+            hechas = 0
+            while hechas < iteraciones:
+                bloque = min(iteraciones_migracion, iteraciones - hechas)
+                tareas = [(opciones_islas[k], n_particulas, estados[k], bloque, int(rng.integers(2**32)))
+                          for k in range(n_islas)]
+                for k, (estado, historial) in enumerate(pool.map(_ejecutar_isla, tareas)):
+                    estados[k] = estado
+                    historiales[k].extend(historial)
+                hechas += bloque
+
+                if n_islas > 1 and hechas < iteraciones:
+                    _migrar(estados, n_migrantes)
+    finally:
+        liberar_memorias(memorias)
+    print("--- Optimización Finalizada ---")
+
+    mejor = min(range(n_islas), key=lambda k: estados[k]['best_cost'])
+    optimizador.gbest_coords = estados[mejor]['best_pos'].reshape(optimizador.N_SENSORES, 2)
+    optimizador.gbest_cost = estados[mejor]['best_cost']
+    # Mejor costo global (entre todas las islas) en cada iteración
+    optimizador.historial_costo = np.minimum.reduce([np.asarray(h) for h in historiales]).tolist()
+    optimizador.costos_islas = [estado['best_cost'] for estado in estados]
+    optimizador.opciones_islas = opciones_islas
@@ -3,11 +3,7 @@
 from procesador_datos import ProcesadorDatos
 from optimizador_pso import OptimizadorPSO
 from datos_entrada import datos_entrada_str
-
-import numpy as np
-import matplotlib.pyplot as plt
-from pyswarms.utils.plotters import plot_cost_history
-from scipy.spatial.distance import cdist 
+from graficas import graficar_mapa
 
 if __name__ == "__main__":
     
@@ -46,39 +42,4 @@ if __name__ == "__main__":
         print(f"Sensor {k+1}: Lat={lat:.6f}, Lon={lon:.6f}")
 
     # 4. Visualización (Solo Mapa Geoespacial)
-
-    # Tamaño de grafica
-    plt.figure(figsize=(10, 7))
-
-    # Puntos de referencia (Cultivos)
-    df = procesador.df
-    mapa_color_cultivo = {'Maíz': 'red', 'Chile': 'blue', 'Tomate': 'green'}
-    plt.scatter(df['Longitud'], df['Latitud'], 
-                c=df['Cultivo'].apply(lambda x: mapa_color_cultivo.get(x, 'black')), 
-                label='Puntos de Referencia', alpha=0.6)
-
-    # Posiciones óptimas de los sensores
-    plt.scatter(optimizador.gbest_coords[:, 1], optimizador.gbest_coords[:, 0], 
-                marker='*', s=300, color='gold', edgecolor='black', zorder=5, 
-                label=f'Ubicación Óptima de {N_SENSORES} Sensores (PSO)')
-
-    # Conectar cada sensor a su punto de referencia más cercano
-    distancias_final = cdist(optimizador.gbest_coords, procesador.PUNTOS_REF)
-    indices_ref_mas_cercano_final = np.argmin(distancias_final, axis=1)
-
-    for k in range(N_SENSORES):
-        ref_lat, ref_lon = procesador.PUNTOS_REF[indices_ref_mas_cercano_final[k]]
-        plt.plot([optimizador.gbest_coords[k, 1], ref_lon], [optimizador.gbest_coords[k, 0], ref_lat], 'k--', alpha=0.3)
-
-    plt.title("Mapa Geoespacial de Cultivos y Colocación Óptima de Sensores (Guasave)")
-    plt.xlabel("Longitud")
-    plt.ylabel("Latitud")
-    
-    leyenda_cultivos = [plt.Line2D([0], [0], marker='o', color='w', label=c, 
-                                  markerfacecolor=mapa_color_cultivo[c], markersize=10) 
-                       for c in ['Maíz', 'Chile', 'Tomate']]
-    leyenda_sensores = [plt.Line2D([0], [0], marker='*', color='w', label='Sensor Óptimo', 
-                                   markerfacecolor='gold', markeredgecolor='black', markersize=15)]
-    plt.legend(handles=leyenda_cultivos + leyenda_sensores, title='Cultivo', loc='lower right')
-    plt.grid(True)
-    plt.show()
\ No newline at end of file
+    graficar_mapa(procesador, optimizador)
@@ -0,0 +1,61 @@
+# memoria_compartida.py
+
+import copy
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Arreglos de ProcesadorDatos que se comparten con los procesos trabajadores
+ARREGLOS_COMPARTIDOS = ('PUNTOS_REF', 'REF_CODIGO_CULTIVO', 'REF_CRITICIDAD',
+                        'REF_ELEVACION_NORM', 'REF_SALINIDAD_NORM', 'raster')
+
+
+def compartir_procesador(procesador):
+    """
+    Copia los arreglos del ProcesadorDatos (y el raster, si está construido) a
+    memoria compartida.
+
+    Devuelve los bloques de memoria (el llamador debe liberarlos con
+    liberar_memorias()), una copia ligera del procesador sin arreglos ni DataFrame
+    (barata de enviar a cada proceso) y, por cada arreglo, su nombre, el nombre
+    del bloque, forma y tipo, para conectar_procesador().
+    """
+    memorias, descriptores = [], []
+    ligero = copy.copy(procesador)
+    ligero.df = None
+    ligero.REF_CULTIVOS = None
+    ligero._arbol = None
+
+    for nombre in ARREGLOS_COMPARTIDOS:
+        arreglo = getattr(procesador, nombre, None)
+        if arreglo is None:
+            continue
+        arreglo = np.ascontiguousarray(arreglo)
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, arreglo.nbytes))
+        np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=memoria.buf)[...] = arreglo
+        memorias.append(memoria)
+        descriptores.append((nombre, memoria.name, arreglo.shape, arreglo.dtype.str))
+        setattr(ligero, nombre, None)
+
+    return memorias, ligero, descriptores
+
+
+def conectar_procesador(procesador, descriptores):
+    """
+    En el proceso trabajador: apunta los arreglos del procesador ligero a la
+    memoria compartida (sin copiarlos). Devuelve los bloques abiertos, que deben
+    mantenerse vivos mientras se usen los arreglos.
+    """
+    memorias = []
+    for nombre, nombre_memoria, forma, tipo in descriptores:
+        memoria = shared_memory.SharedMemory(name=nombre_memoria)
+        memorias.append(memoria)
+        setattr(procesador, nombre, np.ndarray(forma, dtype=np.dtype(tipo), buffer=memoria.buf))
+    return memorias
+
+
+def liberar_memorias(memorias):
+    """Cierra y libera los bloques creados por compartir_procesador()."""
+    for memoria in memorias:
+        memoria.close()
+        memoria.unlink()
@@ -1,17 +1,38 @@
 # optimizador_pso.py
 
+import contextlib
+import time
+
 import numpy as np
 import pyswarms as ps
-from scipy.spatial.distance import cdist 
-from procesador_datos import ProcesadorDatos
+from pyswarms.backend.operators import compute_pbest
+from procesador_datos import ProcesadorDatos, METODOS_BUSQUEDA, RESOLUCION_RASTER
+
+@contextlib.contextmanager
+def _semilla_global(semilla):
+    """Siembra el generador global de NumPy (el que usa PySwarms) durante el bloque y luego restaura su estado."""
+    if semilla is None:
+        yield
+        return
+    estado = np.random.get_state()
+    np.random.seed(semilla)
+    try:
+        yield
+    finally:
+        np.random.set_state(estado)
+
 
 class OptimizadorPSO:
     """
     Clase para implementar y ejecutar el algoritmo PSO, conteniendo la lógica 
     de la Función de Aptitud (Fitness) para la colocación de sensores.
     """
-    def __init__(self, procesador_datos: ProcesadorDatos, n_sensores, w_cultivo, w_suelo, w_cobertura):
+    def __init__(self, procesador_datos: ProcesadorDatos, n_sensores, w_cultivo, w_suelo, w_cobertura,
+                 busqueda='kdtree', resolucion_raster=RESOLUCION_RASTER):
+        if busqueda not in METODOS_BUSQUEDA:
+            raise ValueError(f"Método de búsqueda desconocido: {busqueda!r} (opciones: {METODOS_BUSQUEDA})")
         self.dp = procesador_datos
+        self.busqueda = busqueda
         self.N_SENSORES = n_sensores
         self.D = n_sensores * 2 
         
@@ -38,43 +59,30 @@ class OptimizadorPSO:
 
         self.limites = (np.array(min_b_lat_lon), np.array(max_b_lat_lon))
 
-    def _calcular_aptitud_individual(self, X):
-        """Calcula la aptitud para una única posición (partícula)."""
-        sensor_coords = X.reshape(self.N_SENSORES, 2)
-        
-        distancias = cdist(sensor_coords, self.dp.PUNTOS_REF)
-        indices_ref_mas_cercano = np.argmin(distancias, axis=1)
+        # Modo raster: el punto más cercano se precalcula sobre los límites de búsqueda
+        if busqueda == 'raster':
+            self.dp.construir_raster(self.limites[0][:2], self.limites[1][:2], resolucion_raster)
 
-        # --- FACTOR CULTIVO (Bucle for tradicional) ---
-        closest_cultivos = self.dp.REF_CULTIVOS[indices_ref_mas_cercano]
-        
-        puntuaciones_cultivo_lista = []
-        for c in closest_cultivos:
-            puntuaciones_cultivo_lista.append(self.dp.MAPA_CRITICIDAD[c])
+        # Pares de sensores para el factor de cobertura
+        self._pares_sensores = np.triu_indices(self.N_SENSORES, k=1)
 
-        puntuaciones_cultivo = np.array(puntuaciones_cultivo_lista)
+        # Generador de los reinicios; ejecutar_optimizacion lo vuelve a sembrar con su semilla
+        self.rng = np.random.default_rng()
 
-        F_cultivo = np.mean(puntuaciones_cultivo) / max(self.dp.MAPA_CRITICIDAD.values()) 
+    def _calcular_aptitud_individual(self, X):
+        """Calcula la aptitud para una única posición (partícula)."""
+        return self.funcion_aptitud(X[np.newaxis, :])[0]
 
-        # --- FACTOR SUELO/TOPOGRAFÍA ---
-        puntuaciones_salinidad = self.dp.REF_SALINIDAD_NORM[indices_ref_mas_cercano]
-        F_salinidad = np.mean(puntuaciones_salinidad) 
+    def funcion_aptitud(self, X):
+        """
+        Función para PySwarms: calcula el costo de todo el enjambre de una vez.
 
-        puntuaciones_elevacion = self.dp.REF_ELEVACION_NORM[indices_ref_mas_cercano]
-        F_elevacion_varianza = np.std(puntuaciones_elevacion)
-        
-        F_suelo = 0.5 * F_salinidad + 0.5 * F_elevacion_varianza 
+        X tiene forma (partículas, 2 * N_SENSORES). El punto de referencia más
+        cercano de todos los sensores del enjambre se busca en una sola consulta
+        por lotes (ver ProcesadorDatos.indices_mas_cercanos).
+        """
+        F_cultivo, F_suelo, F_cobertura = self.calcular_factores(X)
 
-        # --- FACTOR COBERTURA ---
-        F_cobertura = 0.0
-        if self.N_SENSORES > 1:
-            distancias_sensor = cdist(sensor_coords, sensor_coords)
-            indices_triangulo_superior = np.triu_indices(self.N_SENSORES, k=1)
-            
-            if len(indices_triangulo_superior[0]) > 0:
-                F_cobertura_promedio = np.mean(distancias_sensor[indices_triangulo_superior])
-                F_cobertura = F_cobertura_promedio / self.dp.max_dist_campo
-        
         # --- APTITUD TOTAL (Se busca MAXIMIZAR) ---
         Aptitud_Total = (self.W_CULTIVO * F_cultivo) + \
                         (self.W_SUELO * F_suelo) + \
@@ -82,26 +90,165 @@ class OptimizadorPSO:
 
         return -Aptitud_Total
 
-    def funcion_aptitud(self, X):
-        """Función 'envoltorio' para PySwarms, calcula el costo para todas las partículas."""
-        costo = np.array([self._calcular_aptitud_individual(X[i]) for i in range(X.shape[0])])
-        return costo
+    def calcular_factores(self, X):
+        """Factores de la aptitud (F_cultivo, F_suelo, F_cobertura) de cada partícula de X, sin ponderar."""
+        sensor_coords = X.reshape(X.shape[0], self.N_SENSORES, 2)
+
+        indices_ref_mas_cercano = self.dp.indices_mas_cercanos(
+            sensor_coords.reshape(-1, 2), self.busqueda).reshape(X.shape[0], self.N_SENSORES)
 
-    def ejecutar_optimizacion(self, n_particulas=60, iteraciones=150, c1=0.7, c2=0.9, w=0.75):
-        """Ejecuta el algoritmo PSO."""
-        opciones = {'c1': c1, 'c2': c2, 'w': w}
+        # --- FACTOR CULTIVO ---
+        puntuaciones_cultivo = self.dp.REF_CRITICIDAD[indices_ref_mas_cercano]
+        F_cultivo = puntuaciones_cultivo.mean(axis=1) / self.dp.MAX_CRITICIDAD
+
+        # --- FACTOR SUELO/TOPOGRAFÍA ---
+        F_salinidad = self.dp.REF_SALINIDAD_NORM[indices_ref_mas_cercano].mean(axis=1, dtype=np.float64)
+        F_elevacion_varianza = self.dp.REF_ELEVACION_NORM[indices_ref_mas_cercano].std(axis=1, dtype=np.float64)
+
+        F_suelo = 0.5 * F_salinidad + 0.5 * F_elevacion_varianza
+
+        # --- FACTOR COBERTURA (distancia media entre pares de sensores) ---
+        F_cobertura = np.zeros(X.shape[0])
+        if self.N_SENSORES > 1:
+            i, j = self._pares_sensores
+            distancias_sensor = np.linalg.norm(sensor_coords[:, i] - sensor_coords[:, j], axis=2)
+            F_cobertura = distancias_sensor.mean(axis=1) / self.dp.max_dist_campo
+
+        return F_cultivo, F_suelo, F_cobertura
+
+    def ejecutar_optimizacion(self, n_particulas=60, iteraciones=150, c1=0.7, c2=0.9, w=0.75,
+                              ventana_estancamiento=None, tolerancia_mejora=1e-6, diametro_minimo=None,
+                              fraccion_reinicio=0.0, max_reinicios=3, tiempo_max=None, semilla=None):
+        """
+        Ejecuta el algoritmo PSO.
+
+        Criterios de parada anticipada (desactivados por defecto):
+        - estancamiento: el mejor costo no mejora más de tolerancia_mejora en
+          ventana_estancamiento iteraciones, o el diámetro del enjambre (en el
+          espacio de búsqueda normalizado a [0, 1]) baja de diametro_minimo;
+        - tiempo_max: presupuesto de tiempo de reloj en segundos.
+        Con 0 < fraccion_reinicio < 1, al estancarse se reinicia esa fracción de las
+        partículas (las de peor mejor personal) en posiciones aleatorias, hasta
+        max_reinicios veces; después el estancamiento detiene la corrida. La
+        partícula del mejor global nunca se reinicia, así que su costo no empeora.
+
+        Con semilla la corrida es reproducible: los reinicios usan self.rng
+        (np.random.Generator sembrado con ella) y PySwarms, que usa el generador
+        global de NumPy, lo recibe sembrado solo durante la corrida, así que el
+        estado global del llamador no cambia.
+
+        motivo_parada, iteraciones_realizadas y reinicios quedan como atributos.
+        """
+        if not 0 <= fraccion_reinicio < 1:
+            raise ValueError(f"fraccion_reinicio debe estar en [0, 1): {fraccion_reinicio}")
+        self.rng = np.random.default_rng(semilla)
+        with _semilla_global(semilla):
+            opciones = {'c1': c1, 'c2': c2, 'w': w}
+            optimizador = self._crear_enjambre(n_particulas, opciones)
+            swarm = optimizador.swarm
+
+            print(f"\n--- Iniciando Optimización PSO con {self.N_SENSORES} Sensores ({self.D} dimensiones) ---")
+            inicio = time.perf_counter()
+            self.motivo_parada = 'iteraciones'
+            self.reinicios = 0
+            # Iteración y costo de la última mejora significativa (o del último reinicio)
+            iteracion_mejora, costo_referencia = 0, np.inf
+
+            for iteracion in range(1, iteraciones + 1):
+                self._iterar(optimizador, 1)
+
+                if swarm.best_cost < costo_referencia - tolerancia_mejora:
+                    iteracion_mejora, costo_referencia = iteracion, swarm.best_cost
+
+                estancado = (
+                    (ventana_estancamiento is not None and iteracion - iteracion_mejora >= ventana_estancamiento)
+                    or (diametro_minimo is not None and self.diametro_enjambre(swarm.position) < diametro_minimo)
+                )
+                if estancado:
+                    if fraccion_reinicio > 0 and self.reinicios < max_reinicios:
+                        self._reiniciar_particulas(swarm, fraccion_reinicio)
+                        self.reinicios += 1
+                        iteracion_mejora = iteracion
+                    else:
+                        self.motivo_parada = 'estancamiento'
+                        break
+                if tiempo_max is not None and time.perf_counter() - inicio >= tiempo_max:
+                    self.motivo_parada = 'tiempo'
+                    break
+        print(f"--- Optimización Finalizada ({self.motivo_parada}, {iteracion} iteraciones, "
+              f"{self.reinicios} reinicios) ---")
+
+        self.gbest_coords = swarm.best_pos.reshape(self.N_SENSORES, 2)
+        self.gbest_cost = optimizador.cost_history[-1] 
+        self.historial_costo = optimizador.cost_history 
+        self.iteraciones_realizadas = iteracion
+        self.optimizador = optimizador
+
+    def diametro_enjambre(self, posiciones):
+        """Mayor distancia entre dos partículas, con cada dimensión normalizada a [0, 1] según los límites."""
+        normalizadas = (posiciones - self.limites[0]) / (self.limites[1] - self.limites[0])
+        diferencias = normalizadas[:, np.newaxis, :] - normalizadas[np.newaxis, :, :]
+        return np.sqrt(np.einsum('ijk,ijk->ij', diferencias, diferencias).max())
+
+    def _reiniciar_particulas(self, swarm, fraccion):
+        """
+        Reubica al azar la fracción de partículas con peor mejor personal (olvidan su
+        mejor personal). Nunca toca la del mejor global, para que best_cost no empeore.
+        """
+        n_reinicio = min(max(1, int(round(fraccion * swarm.n_particles))), swarm.n_particles - 1)
+        if n_reinicio == 0:
+            return
+        peores = np.argsort(swarm.pbest_cost)[-n_reinicio:]
+        nuevas = self.rng.uniform(self.limites[0], self.limites[1], size=(n_reinicio, self.D))
+        swarm.position[peores] = nuevas
+        swarm.velocity[peores] = 0.0
+        swarm.pbest_pos[peores] = nuevas
+        swarm.pbest_cost[peores] = np.inf
+
+    def _crear_enjambre(self, n_particulas, opciones, init_pos=None):
+        """Crea un GlobalBestPSO listo para avanzar con _iterar()."""
         optimizador = ps.single.GlobalBestPSO(
             n_particles=n_particulas,
             dimensions=self.D,
             options=opciones,
-            bounds=self.limites
+            bounds=self.limites,
+            init_pos=init_pos
         )
+        optimizador.swarm.pbest_cost = np.full(n_particulas, np.inf)
+        optimizador.bh.memory = optimizador.swarm.position
+        optimizador.vh.memory = optimizador.swarm.position
+        return optimizador
 
-        print(f"\n--- Iniciando Optimización PSO con {self.N_SENSORES} Sensores ({self.D} dimensiones) ---")
-        historial_costo, pos_mejor_particula = optimizador.optimize(self.funcion_aptitud, iters=iteraciones)
-        print("--- Optimización Finalizada ---")
-        
-        self.gbest_coords = pos_mejor_particula.reshape(self.N_SENSORES, 2)
-        self.gbest_cost = optimizador.cost_history[-1] 
-        self.historial_costo = optimizador.cost_history 
-        self.optimizador = optimizador
\ No newline at end of file
+    def _iterar(self, optimizador, iteraciones):
+        """
+        Avanza el enjambre `iteraciones` iteraciones (mismo cuerpo que
+        GlobalBestPSO.optimize, pero sin reiniciar los mejores personales, así que
+        se puede llamar varias veces seguidas).
+        """
+        swarm = optimizador.swarm
+        top = optimizador.top
+        for _ in range(iteraciones):
+            swarm.current_cost = self.funcion_aptitud(swarm.position)
+            swarm.pbest_pos, swarm.pbest_cost = compute_pbest(swarm)
+            swarm.best_pos, swarm.best_cost = top.compute_gbest(swarm)
+            optimizador.cost_history.append(swarm.best_cost)
+
+            swarm.velocity = top.compute_velocity(swarm, optimizador.velocity_clamp, optimizador.vh, optimizador.bounds)
+            swarm.position = top.compute_position(swarm, optimizador.bounds, optimizador.bh)
+
+    def ejecutar_islas(self, n_islas=None, n_procesos=None, n_particulas=60, iteraciones=150,
+                       iteraciones_migracion=10, n_migrantes=2, c1=0.7, c2=0.9, w=0.75, semilla=None):
+        """
+        Modelo de islas: varios enjambres en paralelo (un pool de procesos), cada uno
+        con su semilla y sus coeficientes (la isla 0 usa c1, c2, w; las demás, valores
+        sorteados alrededor de ellos). Cada `iteraciones_migracion` iteraciones las
+        n_migrantes mejores partículas de cada isla reemplazan a las peores de la
+        siguiente (anillo). Los arreglos de ProcesadorDatos se comparten con
+        memoria compartida.
+
+        Deja los resultados en los mismos atributos que ejecutar_optimizacion
+        (gbest_coords, gbest_cost, historial_costo).
+        """
+        from islas import ejecutar_islas
+        ejecutar_islas(self, n_islas, n_procesos, n_particulas, iteraciones, iteraciones_migracion,
+                       n_migrantes, {'c1': c1, 'c2': c2, 'w': w}, semilla)
\ No newline at end of file
@@ -1,42 +1,322 @@
 # procesador_datos.py
 
-import pandas as pd
+import hashlib
+import os
+from pathlib import Path
 import numpy as np
 from io import StringIO
+from scipy.spatial import cKDTree
+
+# Métodos para buscar el punto de referencia más cercano
+METODOS_BUSQUEDA = ('kdtree', 'fuerza_bruta', 'raster')
+# Celdas por eje del raster y puntos de muestra para medir su error
+RESOLUCION_RASTER = 512
+MUESTRAS_ERROR_RASTER = 10_000
+# Máximo de distancias (consultas x puntos) por bloque en la fuerza bruta
+TAMANO_BLOQUE = 1 << 22
+
+# Columnas que usa la función de aptitud (las demás no se cargan al leer archivos)
+COLUMNAS = ['Cultivo', 'Elevación (m)', 'Salinidad (dS/m)', 'Latitud', 'Longitud']
+# Filas por bloque al leer archivos grandes
+FILAS_POR_BLOQUE = 500_000
+# Forma de los arreglos guardados (tipos compactos, normalización); entra en la
+# huella del archivo, así que al subirla se vuelve a leer el CSV/Parquet
+VERSION_CACHE = 1
+ARREGLOS_CACHE = ('puntos', 'cultivo', 'elevacion', 'salinidad', 'limites', 'descartadas')
 
 class ProcesadorDatos:
     """
     Clase para cargar, preprocesar y normalizar los datos del campo agrícola, 
     preparando los límites para el algoritmo PSO.
+
+    Los datos quedan en arreglos NumPy compactos: PUNTOS_REF (float32, n x 2),
+    REF_CODIGO_CULTIVO y REF_CRITICIDAD (int8), REF_ELEVACION_NORM y
+    REF_SALINIDAD_NORM (float32, normalizadas entre 0 y 1).
+
+    ProcesadorDatos(data_str) lee una cadena CSV y conserva además el DataFrame
+    en self.df; ProcesadorDatos.desde_archivo(ruta) lee archivos CSV/Parquet
+    grandes por bloques, sin DataFrame completo, y guarda una caché en disco.
+    pandas se importa solo al leer datos (no al abrir la caché).
     """
     def __init__(self, data_str):
-        self.MAPA_CRITICIDAD = {'Tomate': 3, 'Chile': 2, 'Maíz': 1}
+        self._inicializar()
         self.df = self._cargar_datos(data_str)
         self._preprocesar_datos()
 
+    @classmethod
+    def desde_archivo(cls, ruta, filas_por_bloque=FILAS_POR_BLOQUE, directorio_cache=None, usar_cache=True):
+        """
+        Carga un archivo CSV o Parquet leyendo solo COLUMNAS, por bloques de
+        `filas_por_bloque` filas: mínimos y máximos se calculan en la misma pasada
+        y solo se guardan los arreglos compactos.
+
+        Los arreglos procesados se guardan en `directorio_cache/<hash>/*.npy`
+        (por omisión `.cache` junto al archivo); el hash depende de la ruta, el
+        tamaño y la fecha de modificación del archivo. Las siguientes cargas los
+        abren memory-mapped sin volver a leer el archivo.
+        """
+        ruta = Path(ruta).resolve()
+        procesador = cls.__new__(cls)
+        procesador._inicializar()
+        procesador.df = None
+        procesador.REF_CULTIVOS = None
+
+        destino = None
+        if usar_cache:
+            directorio_cache = Path(directorio_cache) if directorio_cache else ruta.parent / ".cache"
+            destino = directorio_cache / procesador._hash_archivo(ruta)
+        if destino is not None and all((destino / f"{nombre}.npy").exists() for nombre in ARREGLOS_CACHE):
+            arreglos = {nombre: np.load(destino / f"{nombre}.npy", mmap_mode='r') for nombre in ARREGLOS_CACHE}
+        else:
+            arreglos = procesador._leer_por_bloques(ruta, filas_por_bloque)
+            # Si el archivo cambió mientras se leía, los arreglos no corresponden a la huella
+            if destino is not None and procesador._hash_archivo(ruta) == destino.name:
+                _escribir_cache(destino, arreglos)
+
+        procesador._fijar_arreglos(arreglos)
+        return procesador
+
+    @classmethod
+    def desde_arreglos(cls, puntos, codigo_cultivo, elevacion, salinidad):
+        """
+        Crea el procesador directamente con arreglos (p. ej. campos sintéticos):
+        puntos (n x 2, lat/lon), codigo_cultivo (índice en NOMBRES_CULTIVO),
+        elevación y salinidad sin normalizar.
+        """
+        procesador = cls.__new__(cls)
+        procesador._inicializar()
+        procesador.df = None
+        procesador.REF_CULTIVOS = None
+
+        arreglos = {
+            'puntos': np.asarray(puntos, dtype=np.float64),
+            'cultivo': np.asarray(codigo_cultivo, dtype=np.int8),
+            'elevacion': np.asarray(elevacion, dtype=np.float64),
+            'salinidad': np.asarray(salinidad, dtype=np.float64),
+        }
+        if ((arreglos['cultivo'] < 0) | (arreglos['cultivo'] >= len(procesador.NOMBRES_CULTIVO))).any():
+            raise ValueError("codigo_cultivo fuera de NOMBRES_CULTIVO")
+        extremos = _extremos(arreglos)
+        arreglos['descartadas'] = np.array(0)
+        procesador._fijar_arreglos(_normalizar(arreglos, extremos))
+        return procesador
+
+    def _inicializar(self):
+        self.MAPA_CRITICIDAD = {'Tomate': 3, 'Chile': 2, 'Maíz': 1}
+        self.NOMBRES_CULTIVO = list(self.MAPA_CRITICIDAD)
+        self._arbol = None
+        self.raster = None
+
     def _cargar_datos(self, data_str):
         """Carga los datos de la cadena de texto en un DataFrame."""
+        import pandas as pd
         return pd.read_csv(StringIO(data_str))
 
     def _preprocesar_datos(self):
         """Preprocesa y normaliza las columnas relevantes."""
-        df = self.df
-        
-        self.PUNTOS_REF = df[['Latitud', 'Longitud']].values
-        self.REF_CULTIVOS = df['Cultivo'].values
+        validas, arreglos = self._procesar_bloque(self.df)
+        self.df = self.df[validas].reset_index(drop=True)
+        self.REF_CULTIVOS = self.df['Cultivo'].values
 
-        # Normalización de variables Suelo/Topografía (entre 0 y 1)
-        self.REF_ELEVACION_NORM = (df['Elevación (m)'] - df['Elevación (m)'].min()) / \
-                                  (df['Elevación (m)'].max() - df['Elevación (m)'].min())
-        
-        self.REF_SALINIDAD_NORM = (df['Salinidad (dS/m)'] - df['Salinidad (dS/m)'].min()) / \
-                                  (df['Salinidad (dS/m)'].max() - df['Salinidad (dS/m)'].min())
+        extremos = _extremos(arreglos)
+        arreglos['descartadas'] = np.array(int((~validas).sum()))
+        self._fijar_arreglos(_normalizar(arreglos, extremos))
+
+    def _procesar_bloque(self, df):
+        """
+        Convierte un bloque de filas a arreglos compactos (sin normalizar).
+
+        Las filas incompletas (p. ej. con una columna de menos) quedan con
+        coordenadas NaN, que romperían la búsqueda del punto más cercano: se
+        descartan. Devuelve la máscara de filas válidas y los arreglos.
+        """
+        import pandas as pd
+        validas = df[COLUMNAS].notna().all(axis=1).to_numpy()
+        df = df[validas]
+
+        # Cultivo codificado como entero (índice en NOMBRES_CULTIVO)
+        codigos = pd.Categorical(df['Cultivo'], categories=self.NOMBRES_CULTIVO).codes
+        if (codigos < 0).any():
+            desconocidos = set(df['Cultivo'][codigos < 0])
+            raise ValueError(f"Cultivos sin criticidad definida: {sorted(desconocidos)}")
+
+        return validas, {
+            'puntos': df[['Latitud', 'Longitud']].to_numpy(dtype=np.float64),
+            'cultivo': codigos.astype(np.int8),
+            'elevacion': df['Elevación (m)'].to_numpy(dtype=np.float64),
+            'salinidad': df['Salinidad (dS/m)'].to_numpy(dtype=np.float64),
+        }
+
+    def _leer_por_bloques(self, ruta, filas_por_bloque):
+        """Lee el archivo por bloques; devuelve los arreglos compactos ya normalizados."""
+        if ruta.suffix.lower() == '.parquet':
+            import pyarrow.parquet as pq
+            bloques = (lote.to_pandas() for lote in
+                       pq.ParquetFile(ruta).iter_batches(batch_size=filas_por_bloque, columns=COLUMNAS))
+        else:
+            import pandas as pd
+            bloques = pd.read_csv(ruta, usecols=COLUMNAS, chunksize=filas_por_bloque)
+
+        partes = {'puntos': [], 'cultivo': [], 'elevacion': [], 'salinidad': []}
+        extremos = None
+        descartadas = 0
+        for bloque in bloques:
+            validas, arreglos = self._procesar_bloque(bloque)
+            descartadas += int((~validas).sum())
+            if len(arreglos['cultivo']) == 0:
+                continue
+            extremos = _extremos(arreglos, extremos)
+            for nombre, arreglo in arreglos.items():
+                # Solo se guardan las versiones compactas (float32 / int8)
+                partes[nombre].append(arreglo.astype(np.float32) if arreglo.dtype == np.float64 else arreglo)
+
+        if extremos is None:
+            raise ValueError(f"{ruta.name}: no hay filas válidas")
+        arreglos = {nombre: np.concatenate(lista) for nombre, lista in partes.items()}
+        arreglos['descartadas'] = np.array(descartadas)
+        return _normalizar(arreglos, extremos)
+
+    def _fijar_arreglos(self, arreglos):
+        """Asigna los arreglos compactos y los límites de búsqueda para el PSO."""
+        self.PUNTOS_REF = arreglos['puntos']
+        self.REF_CODIGO_CULTIVO = arreglos['cultivo']
+
+        # Criticidad de cada punto codificada como entero (evita buscar en el diccionario por sensor)
+        criticidad_por_codigo = np.array([self.MAPA_CRITICIDAD[c] for c in self.NOMBRES_CULTIVO], dtype=np.int8)
+        self.REF_CRITICIDAD = criticidad_por_codigo[self.REF_CODIGO_CULTIVO]
+        self.MAX_CRITICIDAD = max(self.MAPA_CRITICIDAD.values())
+
+        # Variables Suelo/Topografía normalizadas (entre 0 y 1)
+        self.REF_ELEVACION_NORM = arreglos['elevacion']
+        self.REF_SALINIDAD_NORM = arreglos['salinidad']
+        self.filas_descartadas = int(arreglos['descartadas'])
 
         # Límites de Búsqueda para el PSO
-        min_lat, max_lat = df['Latitud'].min(), df['Latitud'].max()
-        min_lon, max_lon = df['Longitud'].min(), df['Longitud'].max()
+        min_lat, min_lon, max_lat, max_lon = (float(x) for x in arreglos['limites'])
         self.min_coords = np.array([min_lat, min_lon])
         self.max_coords = np.array([max_lat, max_lon])
         
         # Distancia Máxima del Campo
-        self.max_dist_campo = np.linalg.norm(self.max_coords - self.min_coords)
\ No newline at end of file
+        self.max_dist_campo = np.linalg.norm(self.max_coords - self.min_coords)
+
+    def _hash_archivo(self, ruta):
+        """Huella del archivo (ruta, tamaño, fecha), del mapa de criticidad y de la versión de la caché."""
+        estado = ruta.stat()
+        huella = f"v{VERSION_CACHE}|{ruta}|{estado.st_size}|{estado.st_mtime_ns}|{sorted(self.MAPA_CRITICIDAD.items())}"
+        return hashlib.sha256(huella.encode()).hexdigest()[:16]
+
+    def indices_mas_cercanos(self, coords, metodo='kdtree'):
+        """
+        Índice del punto de referencia más cercano a cada coordenada de `coords` (q x 2).
+
+        - 'kdtree': consultas por lotes a un KD-tree sobre PUNTOS_REF (se construye
+          una sola vez); O(q log n).
+        - 'fuerza_bruta': todas las distancias, por bloques para acotar la memoria;
+          O(q * n).
+        - 'raster': O(1) por consulta, leyendo la celda de la rejilla precalculada
+          con construir_raster() (aproximado, ver error_raster).
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if metodo == 'raster':
+            if self.raster is None:
+                raise ValueError("El raster no se ha construido (ver construir_raster)")
+            celdas = np.floor((coords - self._origen_raster) / self._paso_raster).astype(np.intp)
+            np.clip(celdas, 0, np.array(self.raster.shape) - 1, out=celdas)
+            return self.raster[celdas[:, 0], celdas[:, 1]]
+        if metodo == 'kdtree':
+            if self._arbol is None:
+                self._arbol = cKDTree(self.PUNTOS_REF)
+            _, indices = self._arbol.query(coords)
+            return indices
+        if metodo == 'fuerza_bruta':
+            puntos = self.PUNTOS_REF
+            bloque = max(1, TAMANO_BLOQUE // len(puntos))
+            indices = np.empty(len(coords), dtype=np.intp)
+            for inicio in range(0, len(coords), bloque):
+                diferencias = coords[inicio:inicio + bloque, np.newaxis, :] - puntos[np.newaxis, :, :]
+                distancias = np.einsum('qmk,qmk->qm', diferencias, diferencias)
+                indices[inicio:inicio + bloque] = np.argmin(distancias, axis=1)
+            return indices
+        raise ValueError(f"Método de búsqueda desconocido: {metodo!r} (opciones: {METODOS_BUSQUEDA})")
+
+    def construir_raster(self, minimos, maximos, resolucion=RESOLUCION_RASTER, semilla=0):
+        """
+        Precalcula el punto de referencia más cercano sobre una rejilla (raster de
+        Voronoi) que cubre [minimos, maximos] = [(lat, lon), (lat, lon)], con
+        `resolucion` celdas por eje. Cada celda guarda el punto más cercano a su centro.
+
+        Deja en self.error_raster la cota teórica y el error medido contra la
+        búsqueda exacta en MUESTRAS_ERROR_RASTER puntos aleatorios:
+        - 'cota_distancia': diagonal de una celda. Usar el punto de la celda en vez
+          del más cercano nunca alarga la distancia más que esto.
+        - 'discrepancia': fracción de muestras con un punto distinto al exacto.
+        - 'error_max': mayor distancia extra observada en las muestras.
+        """
+        minimos = np.asarray(minimos, dtype=np.float64)
+        maximos = np.asarray(maximos, dtype=np.float64)
+        # Ya construido sobre la misma rejilla (p. ej. otro OptimizadorPSO con los mismos límites)
+        if (self.raster is not None and self.raster.shape == (resolucion, resolucion)
+                and np.array_equal(self._origen_raster, minimos)
+                and np.array_equal(self._paso_raster, (maximos - minimos) / resolucion)):
+            return self.error_raster
+
+        self._origen_raster = minimos
+        self._paso_raster = (maximos - minimos) / resolucion
+
+        ejes = [minimos[k] + (np.arange(resolucion) + 0.5) * self._paso_raster[k] for k in range(2)]
+        centros = np.stack(np.meshgrid(*ejes, indexing='ij'), axis=-1).reshape(-1, 2)
+        self.raster = self.indices_mas_cercanos(centros, 'kdtree').astype(np.int32).reshape(resolucion, resolucion)
+
+        # --- Error contra la búsqueda exacta ---
+        muestras = np.random.default_rng(semilla).uniform(minimos, maximos, size=(MUESTRAS_ERROR_RASTER, 2))
+        exactos = self.indices_mas_cercanos(muestras, 'kdtree')
+        aproximados = self.indices_mas_cercanos(muestras, 'raster')
+        extra = (np.linalg.norm(muestras - self.PUNTOS_REF[aproximados], axis=1)
+                 - np.linalg.norm(muestras - self.PUNTOS_REF[exactos], axis=1))
+        self.error_raster = {
+            'resolucion': resolucion,
+            'cota_distancia': float(np.linalg.norm(self._paso_raster)),
+            'discrepancia': float(np.mean(aproximados != exactos)),
+            'error_max': float(extra.max()),
+        }
+        return self.error_raster
+
+
+def _extremos(arreglos, extremos=None):
+    """Mínimos y máximos (lat, lon, elevación, salinidad) acumulados bloque a bloque."""
+    puntos = arreglos['puntos']
+    minimos = np.array([*puntos.min(axis=0), arreglos['elevacion'].min(), arreglos['salinidad'].min()])
+    maximos = np.array([*puntos.max(axis=0), arreglos['elevacion'].max(), arreglos['salinidad'].max()])
+    if extremos is not None:
+        minimos = np.minimum(minimos, extremos[0])
+        maximos = np.maximum(maximos, extremos[1])
+    return minimos, maximos
+
+
+def _normalizar(arreglos, extremos):
+    """Normaliza elevación y salinidad con los extremos y deja todo en float32 / int8."""
+    minimos, maximos = extremos
+    normalizados = dict(arreglos)
+    normalizados['puntos'] = arreglos['puntos'].astype(np.float32, copy=False)
+    for k, nombre in ((2, 'elevacion'), (3, 'salinidad')):
+        valores = arreglos[nombre].astype(np.float32, copy=False)
+        normalizados[nombre] = ((valores - minimos[k]) / (maximos[k] - minimos[k])).astype(np.float32)
+    normalizados['limites'] = np.array([minimos[0], minimos[1], maximos[0], maximos[1]])
+    return normalizados
+
+
+def _escribir_cache(destino, arreglos):
+    """
+    Guarda los arreglos compactos de desde_archivo() en `destino`, uno por .npy.
+    Cada archivo se escribe con un nombre provisional y se renombra al terminar:
+    desde_archivo() solo usa la caché si están todos, así que una lectura por
+    bloques interrumpida a medio guardar se repite en la siguiente carga. Dos
+    trabajos por lotes sobre el mismo campo escriben arreglos idénticos, así que
+    no importa cuál renombre al último.
+    """
+    destino.mkdir(parents=True, exist_ok=True)
+    for nombre in ARREGLOS_CACHE:
+        provisional = destino / f"{nombre}.{os.getpid()}.tmp"
+        with open(provisional, 'wb') as f:
+            np.save(f, arreglos[nombre], allow_pickle=False)
+        os.replace(provisional, destino / f"{nombre}.npy")
@@ -1,6 +1,7 @@
-import random
 import math
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 
 class Municipality:
@@ -24,6 +25,25 @@ class Municipality:
         return f"({self.x:.4f},{self.y:.4f})"
 
 
+def distance_matrix(city_list: List[Municipality]) -> np.ndarray:
+    """Matriz (n x n) de distancias euclidianas entre todas las ciudades.
+
+    Se calcula una sola vez al inicio del algoritmo; las rutas se evalúan
+    consultándola en lugar de llamar a `Municipality.distance`. """
+    x = np.array([c.x for c in city_list])
+    y = np.array([c.y for c in city_list])
+    return np.hypot(x[:, np.newaxis] - x[np.newaxis, :], y[:, np.newaxis] - y[np.newaxis, :])
+
+
+def route_distances(population: np.ndarray, dist_matrix: np.ndarray) -> np.ndarray:
+    """Distancia total (volviendo al inicio) de cada ruta.
+
+    `population` es un arreglo (individuos x ciudades) de permutaciones de
+    índices (o una sola ruta 1D). Toda la población se evalúa con una sola
+    consulta a la matriz: arista i -> i+1 de cada ruta y suma por fila. """
+    return dist_matrix[population, np.roll(population, -1, axis=-1)].sum(axis=-1)
+
+
 class Fitness:
     """Calcula y almacena la distancia y la aptitud de una ruta (individuo).
 
@@ -59,154 +79,277 @@ class Fitness:
 
 # -------------------- Operaciones sobre población --------------------
 
-def create_route(city_list: List[Municipality]) -> List[Municipality]:
-    """Crea una ruta aleatoria (permuta) a partir de la lista de ciudades."""
-    return random.sample(city_list, len(city_list))
+def create_route(n_cities: int, rng: np.random.Generator) -> np.ndarray:
+    """Crea una ruta aleatoria: permutación de los índices 0..n_cities-1."""
+    return rng.permutation(n_cities).astype(np.int32)
+
+
+def initial_population(pop_size: int, n_cities: int, rng: np.random.Generator) -> np.ndarray:
+    """Genera la población inicial: arreglo (pop_size x n_cities) con una permutación por fila."""
+    return rng.permuted(np.tile(np.arange(n_cities, dtype=np.int32), (pop_size, 1)), axis=1)
+
+
+def rank_routes(population: np.ndarray, dist_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Devuelve (índices de los individuos, aptitudes), ordenados descendentemente por aptitud.
+
+    La aptitud es 1 / distancia (infinita si la distancia fuese 0). """
+    with np.errstate(divide='ignore'):
+        fitness = 1.0 / route_distances(population, dist_matrix)
+    order = np.argsort(-fitness, kind='stable')
+    return order, fitness[order]
+
+
+def _cumulative_picks(weights: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Posición en la que cae cada punto de [0, suma) sobre los pesos acumulados (búsqueda binaria)."""
+    cumulative = np.cumsum(weights)
+    return np.minimum(np.searchsorted(cumulative, points * cumulative[-1], side='right'), len(weights) - 1)
+
+
+def roulette_selection(fitness: np.ndarray, n_picks: int, rng: np.random.Generator) -> np.ndarray:
+    """Ruleta proporcional a la aptitud: n_picks tiros independientes, O(n_picks log n)."""
+    return _cumulative_picks(fitness, rng.random(n_picks))
+
+
+def sus_selection(fitness: np.ndarray, n_picks: int, rng: np.random.Generator) -> np.ndarray:
+    """Muestreo universal estocástico: una sola ruleta con n_picks punteros equiespaciados.
+
+    Cada individuo sale un número de veces a lo más a 1 de su valor esperado. """
+    return _cumulative_picks(fitness, (rng.random() + np.arange(n_picks)) / n_picks)
 
 
-def initial_population(pop_size: int, city_list: List[Municipality]) -> List[List[Municipality]]:
-    """Genera la población inicial compuesta por `pop_size` rutas."""
-    return [create_route(city_list) for _ in range(pop_size)]
+def tournament_selection(fitness: np.ndarray, n_picks: int, rng: np.random.Generator,
+                         tournament_size: int = 3) -> np.ndarray:
+    """Torneos de tournament_size participantes al azar; gana el de mejor aptitud.
 
+    Como `fitness` viene ordenada (posición 0 = mejor), el ganador es la menor posición. """
+    return rng.integers(0, len(fitness), size=(n_picks, tournament_size)).min(axis=1)
 
-def rank_routes(population: List[List[Municipality]]) -> List[Tuple[int, float]]:
-    """Devuelve una lista de tuplas (índice_individuo, aptitud) ordenada descendentemente por aptitud."""
-    fitness_results = [(i, Fitness(ind).fitness()) for i, ind in enumerate(population)]
-    fitness_results.sort(key=lambda x: x[1], reverse=True)
-    return fitness_results
 
+def rank_selection(fitness: np.ndarray, n_picks: int, rng: np.random.Generator) -> np.ndarray:
+    """Ruleta por rango lineal: el mejor de n pesa n, el siguiente n-1, ..., el peor 1."""
+    return _cumulative_picks(np.arange(len(fitness), 0, -1, dtype=np.float64), rng.random(n_picks))
 
-def selection(pop_ranked: List[Tuple[int, float]], elite_size: int) -> List[int]:
+
+SELECTIONS = {'roulette': roulette_selection, 'sus': sus_selection,
+              'tournament': tournament_selection, 'rank': rank_selection}
+
+
+def selection(pop_ranked: Tuple[np.ndarray, np.ndarray], elite_size: int, rng: np.random.Generator,
+              method: str = 'roulette', tournament_size: int = 3) -> np.ndarray:
     """Selecciona índices de la población para reproducirse.
 
     - Mantiene elite_size mejores individuos (elitismo).
-    - Resto se selecciona por ruleta proporcional a la aptitud. """
-    selection_results = []
-
-    # Elitismo directo
-    for i in range(elite_size):
-        selection_results.append(pop_ranked[i][0])
-
-    # Preparar ruleta: calcular suma de aptitudes y probabilidades acumuladas
-    fitness_sum = sum([f for _, f in pop_ranked])
-    probs = []
-    cum = 0.0
-    for _, f in pop_ranked:
-        # proteger división por cero
-        p = (f / fitness_sum) if fitness_sum > 0 else 0
-        cum += p
-        probs.append(cum)
-
-    # Seleccionar el resto mediante ruleta
-    for _ in range(len(pop_ranked) - elite_size):
-        r = random.random()
-        for idx, cum_prob in enumerate(probs):
-            if r <= cum_prob:
-                selection_results.append(pop_ranked[idx][0])
-                break
-
-    return selection_results
-
-
-def mating_pool(population: List[List[Municipality]], selection_results: List[int]) -> List[List[Municipality]]:
+    - Resto se selecciona con `method` (ver SELECTIONS): ruleta proporcional a la
+      aptitud (por defecto), muestreo universal estocástico, torneo o rango.
+    Todos los métodos eligen a todos los individuos de una vez. """
+    order, fitness = pop_ranked
+    n_picks = len(order) - elite_size
+
+    if method == 'tournament':
+        picks = tournament_selection(fitness, n_picks, rng, tournament_size)
+    else:
+        picks = SELECTIONS[method](fitness, n_picks, rng)
+
+    return np.concatenate([order[:elite_size], order[picks]])
+
+
+def mating_pool(population: np.ndarray, selection_results: np.ndarray) -> np.ndarray:
     """Construye el pool de apareamiento devolviendo las rutas seleccionadas por índice."""
-    return [population[i] for i in selection_results]
+    return population[selection_results]
 
 
-def breed(parent1: List[Municipality], parent2: List[Municipality]) -> List[Municipality]:
-    """Cruza dos padres con un `order crossover` sencillo (preserva orden relativo).
+def _crossover_segments(n_pairs: int, n_cities: int, rng: np.random.Generator) -> np.ndarray:
+    """Máscara (n_pairs x n_cities) del tramo [start, end] (ambos incluidos) de cada cruce."""
+    cuts = np.sort(rng.integers(0, n_cities, size=(n_pairs, 2)), axis=1)
+    positions = np.arange(n_cities)
+    return (positions >= cuts[:, :1]) & (positions <= cuts[:, 1:])
 
-    Elegimos dos puntos y copiamos el tramo del padre1, luego rellenamos con el orden
-    de padre2 sin duplicados. """
-    child = [None] * len(parent1)
 
-    start = random.randint(0, len(parent1) - 1)
-    end = random.randint(0, len(parent1) - 1)
+def order_crossover(parents1: np.ndarray, parents2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """`Order crossover` (OX) de todos los pares a la vez, en O(n) por hijo.
 
-    if start > end:
-        start, end = end, start
+    Cada hijo copia un tramo aleatorio de su padre1 y rellena las demás
+    posiciones, de izquierda a derecha, con las ciudades del padre2 en su orden
+    y sin duplicados. La pertenencia al tramo se consulta en una máscara
+    indexada por ciudad, no buscando en la lista. """
+    in_segment = _crossover_segments(len(parents1), parents1.shape[1], rng)
 
-    # Copiar segmento del padre1
-    for i in range(start, end + 1):
-        child[i] = parent1[i]
+    # taken[k, c]: la ciudad c está en el tramo copiado del padre1 del par k
+    taken = np.zeros(parents1.shape, dtype=bool)
+    np.put_along_axis(taken, parents1, in_segment, axis=1)
+    keep = ~np.take_along_axis(taken, parents2, axis=1)
 
-    # Rellenar con ciudades del padre2 en orden
-    parent2_idx = 0
-    for i in range(len(child)):
-        if child[i] is None:
-            while parent2[parent2_idx] in child:
-                parent2_idx += 1
-            child[i] = parent2[parent2_idx]
+    # Por fila, los huecos del hijo y las ciudades conservadas del padre2 son
+    # igual de numerosos, así que el llenado por máscara respeta el orden
+    children = np.where(in_segment, parents1, 0).astype(parents1.dtype)
+    children[~in_segment] = parents2[keep]
+    return children
 
-    return child
+
+def pmx_crossover(parents1: np.ndarray, parents2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """`Partially mapped crossover` (PMX) de todos los pares a la vez.
+
+    Cada hijo copia un tramo del padre1 y el resto del padre2; una ciudad del
+    padre2 que ya está en el tramo se reemplaza siguiendo el mapeo
+    padre1[i] -> padre2[i] del tramo hasta llegar a una ciudad libre. """
+    n_pairs, n_cities = parents1.shape
+    in_segment = _crossover_segments(n_pairs, n_cities, rng)
+    rows = np.arange(n_pairs)[:, np.newaxis]
+
+    taken = np.zeros(parents1.shape, dtype=bool)
+    np.put_along_axis(taken, parents1, in_segment, axis=1)
+    # position1[k, c]: posición de la ciudad c en el padre1 del par k
+    position1 = np.empty_like(parents1)
+    np.put_along_axis(position1, parents1, np.arange(n_cities, dtype=parents1.dtype), axis=1)
+
+    children = np.where(in_segment, parents1, parents2)
+    conflict_rows, conflict_cols = np.nonzero(~in_segment & taken[rows, children])
+    # Cada vuelta avanza un paso en las cadenas del mapeo (a lo más el largo del tramo)
+    while len(conflict_rows):
+        cities = children[conflict_rows, conflict_cols]
+        children[conflict_rows, conflict_cols] = parents2[conflict_rows, position1[conflict_rows, cities]]
+        still = taken[conflict_rows, children[conflict_rows, conflict_cols]]
+        conflict_rows, conflict_cols = conflict_rows[still], conflict_cols[still]
+    return children
 
 
-def breed_population(matingpool: List[List[Municipality]], elite_size: int) -> List[List[Municipality]]:
+def edge_recombination(parents1: np.ndarray, parents2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """`Edge recombination` (ERX) de todos los pares a la vez.
+
+    Cada hijo empieza en la primera ciudad de su padre1 y en cada paso va al
+    vecino (en alguno de los dos padres) no visitado con menos vecinos libres,
+    desempatando al azar; si no queda ninguno, a una ciudad libre al azar.
+    Todos los hijos avanzan juntos: n pasos vectorizados sobre los pares.
+    Usa una tabla de vecinos de 4 x el tamaño de los padres. """
+    n_pairs, n_cities = parents1.shape
+    rows = np.arange(n_pairs)
+
+    # neighbors[k, c]: vecinos de la ciudad c en los dos padres (-1 = repetido)
+    neighbors = np.empty((n_pairs, n_cities, 4), dtype=parents1.dtype)
+    for slot, parents in enumerate((parents1, parents2)):
+        neighbors[rows[:, np.newaxis], parents, 2 * slot] = np.roll(parents, 1, axis=1)
+        neighbors[rows[:, np.newaxis], parents, 2 * slot + 1] = np.roll(parents, -1, axis=1)
+    repeated = (neighbors[..., 2:, np.newaxis] == neighbors[..., np.newaxis, :2]).any(axis=-1)
+    neighbors[..., 2:][repeated] = -1
+
+    children = np.empty_like(parents1)
+    visited = np.zeros(parents1.shape, dtype=bool)
+    current = parents1[:, 0]
+    children[:, 0] = current
+    for step in range(1, n_cities):
+        visited[rows, current] = True
+
+        candidates = neighbors[rows, current]
+        free = (candidates >= 0) & ~visited[rows[:, np.newaxis], candidates]
+        second = neighbors[rows[:, np.newaxis], candidates]
+        free_count = ((second >= 0) & ~visited[rows[:, np.newaxis, np.newaxis], second]).sum(axis=-1)
+        # Menos vecinos libres primero; la fracción aleatoria desempata
+        score = np.where(free, free_count + rng.random(free.shape), np.inf)
+        current = candidates[rows, np.argmin(score, axis=1)]
+
+        dead_ends = ~free.any(axis=1)
+        if dead_ends.any():
+            current[dead_ends] = np.argmax(~visited[dead_ends] * rng.random((dead_ends.sum(), n_cities)), axis=1)
+        children[:, step] = current
+    return children
+
+
+CROSSOVERS = {'ox': order_crossover, 'pmx': pmx_crossover, 'erx': edge_recombination}
+
+
+def breed(parent1: np.ndarray, parent2: np.ndarray, rng: np.random.Generator, crossover: str = 'ox') -> np.ndarray:
+    """Cruza dos padres con el operador `crossover` ('ox', 'pmx' o 'erx'; ver CROSSOVERS)."""
+    return CROSSOVERS[crossover](parent1[np.newaxis, :], parent2[np.newaxis, :], rng)[0]
+
+
+def breed_population(matingpool: np.ndarray, elite_size: int, rng: np.random.Generator,
+                     crossover: str = 'ox') -> np.ndarray:
     """Genera la nueva población cruzando.
 
     Los elite_size primeros se copian directamente.
-    El resto se obtiene cruzando padres (tomados aleatoriamente del pool). """
-    children = []
+    El resto se obtiene cruzando padres (tomados aleatoriamente del pool); todos
+    los cruces se hacen en una sola llamada al operador. """
+    children = np.empty_like(matingpool)
     length = len(matingpool) - elite_size
-    pool = random.sample(matingpool, len(matingpool))
+    pool = matingpool[rng.permutation(len(matingpool))]
 
     # Copiar élites
-    for i in range(elite_size):
-        children.append(matingpool[i])
+    children[:elite_size] = matingpool[:elite_size]
 
-    # Cruces
-    for i in range(length):
-        child = breed(pool[i], pool[len(matingpool) - i - 1])
-        children.append(child)
+    # Cruces: el i-ésimo padre con el i-ésimo desde el final
+    if length > 0:
+        children[elite_size:] = CROSSOVERS[crossover](pool[:length], pool[::-1][:length], rng)
 
     return children
 
 
-def mutate(individual: List[Municipality], mutation_rate: float) -> List[Municipality]:
+def mutate(individual: np.ndarray, mutation_rate: float, rng: np.random.Generator) -> np.ndarray:
     """Aplica mutación por swap (intercambio de dos genes) con probabilidad mutation_rate por posición."""
-    for swapped in range(len(individual)):
-        if random.random() < mutation_rate:
-            swap_with = int(random.random() * len(individual))
-
-            individual[swapped], individual[swap_with] = individual[swap_with], individual[swapped]
+    for swapped in np.nonzero(rng.random(len(individual)) < mutation_rate)[0]:
+        swap_with = rng.integers(len(individual))
+        individual[swapped], individual[swap_with] = individual[swap_with], individual[swapped]
     return individual
 
 
-def mutate_population(population: List[List[Municipality]], mutation_rate: float) -> List[List[Municipality]]:
-    return [mutate(ind.copy(), mutation_rate) for ind in population]
+def mutate_population(population: np.ndarray, mutation_rate: float, rng: np.random.Generator) -> np.ndarray:
+    """Mutación por swap de toda la población (sobre una copia).
+
+    Las posiciones que mutan se sortean de una vez; solo se recorren esas. """
+    mutated = population.copy()
+    rows, cols = np.nonzero(rng.random(population.shape) < mutation_rate)
+    partners = rng.integers(population.shape[1], size=len(rows))
+    for row, swapped, swap_with in zip(rows, cols, partners):
+        mutated[row, swapped], mutated[row, swap_with] = mutated[row, swap_with], mutated[row, swapped]
+    return mutated
 
 
-def next_generation(current_gen: List[List[Municipality]], elite_size: int, mutation_rate: float) -> List[List[Municipality]]:
+def next_generation(current_gen: np.ndarray, dist_matrix: np.ndarray, elite_size: int, mutation_rate: float,
+                    rng: np.random.Generator, crossover: str = 'ox', selection_method: str = 'roulette',
+                    tournament_size: int = 3) -> np.ndarray:
     """Genera la siguiente generación a partir de la actual."""
-    pop_ranked = rank_routes(current_gen)
-    selection_results = selection(pop_ranked, elite_size)
+    pop_ranked = rank_routes(current_gen, dist_matrix)
+    selection_results = selection(pop_ranked, elite_size, rng, selection_method, tournament_size)
     matingpool = mating_pool(current_gen, selection_results)
-    children = breed_population(matingpool, elite_size)
-    next_gen = mutate_population(children, mutation_rate)
+    children = breed_population(matingpool, elite_size, rng, crossover)
+    next_gen = mutate_population(children, mutation_rate, rng)
     return next_gen
 
 
 def genetic_algorithm(city_list: List[Municipality], population_size: int, elite_size: int,
-                      mutation_rate: float, generations: int, verbose: bool = True) -> List[Municipality]:
-    """Evoluciona una población y devuelve la mejor ruta encontrada."""
-    pop = initial_population(population_size, city_list)
+                      mutation_rate: float, generations: int, verbose: bool = True,
+                      rng: Optional[np.random.Generator] = None, crossover: str = 'ox',
+                      selection_method: str = 'roulette', tournament_size: int = 3) -> List[Municipality]:
+    """Evoluciona una población y devuelve la mejor ruta encontrada.
+
+    Internamente cada individuo es una permutación de índices de `city_list`
+    y las distancias salen de `distance_matrix`, calculada una sola vez.
+    `crossover` elige el operador de cruce ('ox', 'pmx' o 'erx') y
+    `selection_method` el de selección ('roulette', 'sus', 'tournament' o 'rank'). """
+    if crossover not in CROSSOVERS:
+        raise ValueError(f"Cruce desconocido: {crossover!r} (opciones: {list(CROSSOVERS)})")
+    if selection_method not in SELECTIONS:
+        raise ValueError(f"Selección desconocida: {selection_method!r} (opciones: {list(SELECTIONS)})")
+    rng = rng if rng is not None else np.random.default_rng()
+    dist_matrix = distance_matrix(city_list)
+    pop = initial_population(population_size, len(city_list), rng)
 
     if verbose:
-        initial_distance = 1.0 / rank_routes(pop)[0][1]
+        initial_distance = route_distances(pop, dist_matrix).min()
         print(f"Distancia inicial: {initial_distance:.4f}")
 
     for i in range(generations):
-        pop = next_generation(pop, elite_size, mutation_rate)
+        pop = next_generation(pop, dist_matrix, elite_size, mutation_rate, rng, crossover,
+                              selection_method, tournament_size)
 
         if verbose and (i + 1) % max(1, generations // 10) == 0:
-            best_distance = 1.0 / rank_routes(pop)[0][1]
+            best_distance = route_distances(pop, dist_matrix).min()
             print(f"Generación {i+1:4d} mejor distancia: {best_distance:.4f}")
 
-    best_index = rank_routes(pop)[0][0]
-    best_route = pop[best_index]
+    best_index = rank_routes(pop, dist_matrix)[0][0]
+    best_route = [city_list[i] for i in pop[best_index]]
 
     if verbose:
-        final_distance = 1.0 / rank_routes(pop)[0][1]
+        final_distance = route_distances(pop[best_index], dist_matrix)
         print(f"Distancia final: {final_distance:.4f}")
 
     return best_route